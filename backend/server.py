@@ -1,14 +1,41 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Optional, Dict, Any, Iterable, AsyncIterator
 import uuid
-from datetime import datetime, timedelta
+import time
+import calendar
+import bisect
+import heapq
+import struct
+import mmap
+import asyncio
+import hashlib
+import hmac
+import io
+import math
+import re
+import json
+import codecs
+import random
+import contextlib
+import zlib
+import gzip
+import tempfile
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape as xml_escape, quoteattr as xml_quoteattr
+from collections import deque, defaultdict
+from contextvars import ContextVar
+from array import array
+from datetime import datetime, timedelta, timezone
+import functools
 import httpx
 import pytz
 
@@ -35,6 +62,24 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class ReminderCreate(BaseModel):
+    program_id: str
+    channel_id: int
+    lead_minutes: int = Field(5, ge=0, le=24 * 60)  # at most a day ahead
+
+class Reminder(BaseModel):
+    program_id: str
+    channel_id: int
+    title: str
+    start_time: datetime
+    fire_at: datetime
+    lead_minutes: int
+
+class CatalogueIngestRequest(BaseModel):
+    countries: Optional[List[str]] = None
+    categories: Optional[List[str]] = None
+    languages: Optional[List[str]] = None
+
 class ChannelProgram(BaseModel):
     id: str
     title: str
@@ -53,22 +98,805 @@ class Channel(BaseModel):
     name: str
     logo: str
     logo_url: Optional[str] = None
+    logo_proxy_url: Optional[str] = None
     epg_channel_id: Optional[int] = None
+    xmltv_id: Optional[str] = None
     category: Optional[str] = "General"
     programs: List[ChannelProgram] = []
 
+class TrendingChannel(BaseModel):
+    rank: int
+    score: float  # decayed view count
+    channel: Channel
+    now_playing: Optional[ChannelProgram] = None
+    up_next: Optional[ChannelProgram] = None
+
+class GridCell(ChannelProgram):
+    col_start: float  # offset from the window start, in slots
+    col_span: float  # visible width, in slots
+    clipped_start: bool = False
+    clipped_end: bool = False
+
+class GridRow(BaseModel):
+    row: int
+    id: int
+    number: str
+    name: str
+    logo: str
+    logo_url: Optional[str] = None
+    logo_proxy_url: Optional[str] = None
+    category: Optional[str] = "General"
+    cells: List[GridCell] = []
+
+class GridWindow(BaseModel):
+    start: datetime
+    end: datetime
+    slot_minutes: int
+    slots: int
+
+class GridPage(BaseModel):
+    window: GridWindow
+    row_start: int
+    row_count: int
+    total_rows: int
+    rows: List[GridRow]
+    prefetch: Dict[str, Optional[Dict[str, Any]]]
+
+# Viewer Timezones
+# The guide is stored once as UTC epoch seconds and rendered in the viewer's zone
+# (?tz= or X-Timezone) only while a response is serialized.
+DEFAULT_VIEWER_TIMEZONE = os.environ.get('DEFAULT_VIEWER_TIMEZONE', 'UTC')
+TZ_OFFSET_BUCKET = 900  # UTC offset changes fall on quarter-hour boundaries
+TZ_OFFSET_CACHE_SIZE = 4096
+
+class ZoneRenderer:
+    """Converts epoch seconds to aware datetimes in one zone.
+    
+    The zone's UTC offset is looked up once per quarter hour and reused as a fixed
+    offset, so a batch of programmes costs a dict hit per timestamp instead of a
+    transition-table search.
+    """
+    def __init__(self, zone):
+        self.zone = zone
+        self.name = zone.zone if hasattr(zone, 'zone') else str(zone)
+        self._offsets: Dict[int, timezone] = {}
+    
+    def offset(self, ts: float) -> timezone:
+        bucket = int(ts // TZ_OFFSET_BUCKET)
+        fixed = self._offsets.get(bucket)
+        if fixed is None:
+            if len(self._offsets) >= TZ_OFFSET_CACHE_SIZE:
+                self._offsets.clear()
+            utcoffset = datetime.fromtimestamp(bucket * TZ_OFFSET_BUCKET, self.zone).utcoffset()
+            fixed = self._offsets[bucket] = _fixed_offset(utcoffset)
+        return fixed
+    
+    def render(self, ts: float) -> datetime:
+        return datetime.fromtimestamp(ts, self.offset(ts))
+    
+    def render_many(self, timestamps: Iterable[float]) -> List[datetime]:
+        render = self.render
+        return [render(ts) for ts in timestamps]
+
+@functools.lru_cache(maxsize=None)
+def _fixed_offset(utcoffset: timedelta) -> timezone:
+    return timezone.utc if not utcoffset else timezone(utcoffset)
+
+@functools.lru_cache(maxsize=512)
+def zone_renderer(name: str) -> ZoneRenderer:
+    """Shared renderer per zone name; raises pytz.UnknownTimeZoneError for unknown zones"""
+    return ZoneRenderer(pytz.timezone(name))
+
+def viewer_zone(tz: Optional[str] = None, header: Optional[str] = None) -> ZoneRenderer:
+    """Resolve the viewer's zone from the tz query parameter, then the X-Timezone header"""
+    name = (tz or header or DEFAULT_VIEWER_TIMEZONE).strip()
+    try:
+        return zone_renderer(name)
+    except pytz.UnknownTimeZoneError:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {name}")
+
+UTC_RENDERER = zone_renderer('UTC')
+
+# Columnar Guide Storage
+# Programmes are kept as parallel arrays (epoch start/end + dictionary-encoded
+# strings) and only turned into ChannelProgram models when a response is built.
+PROGRAM_TEXT_FIELDS = ("id", "title", "episode", "description", "image", "rating", "genre")
+
+class StringPool:
+    """Dictionary-encodes repeated programme strings as integer codes (-1 is None)"""
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+    
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+    
+    def encode_all(self, values: List[str]) -> List[int]:
+        """Codes for many (non-None) values at once"""
+        if not self._values:
+            codes = dict(zip(values, range(len(values))))
+            if len(codes) == len(values):  # distinct values (e.g. another pool's) keep their positions
+                self._codes, self._values = codes, list(values)
+                return list(range(len(values)))
+        return [self.encode(value) for value in values]
+    
+    def decode(self, code: int) -> Optional[str]:
+        return None if code < 0 else self._values[code]
+    
+    def values(self) -> List[str]:
+        return self._values
+    
+    def __len__(self):
+        return len(self._values)
+
+class ProgramRow:
+    """Lightweight view over a single row of a ChannelSchedule"""
+    __slots__ = ("schedule", "index")
+    
+    def __init__(self, schedule: "ChannelSchedule", index: int):
+        self.schedule = schedule
+        self.index = index
+    
+    @property
+    def start(self) -> int:
+        return self.schedule.starts[self.index]
+    
+    @property
+    def end(self) -> int:
+        return self.schedule.ends[self.index]
+    
+    def text(self, field: str) -> Optional[str]:
+        return self.schedule.pool.decode(self.schedule.columns[field][self.index])
+    
+    def to_model(self, zone: ZoneRenderer = UTC_RENDERER) -> ChannelProgram:
+        schedule = self.schedule
+        return ChannelProgram(
+            start_time=zone.render(self.start),
+            end_time=zone.render(self.end),
+            channel_id=schedule.channel_id,
+            **{field: self.text(field) for field in PROGRAM_TEXT_FIELDS}
+        )
+
+class ChannelSchedule:
+    """Array-backed programme columns for one channel, kept sorted by start time.
+    
+    Start/end are UTC epoch seconds; text fields are codes into a shared StringPool.
+    """
+    def __init__(self, channel_id: int, pool: StringPool):
+        self.channel_id = channel_id
+        self.pool = pool
+        self.starts = array('q')
+        self.ends = array('q')
+        self.columns = {field: array('i') for field in PROGRAM_TEXT_FIELDS}
+    
+    @classmethod
+    def from_columns(cls, channel_id: int, pool, starts, ends, columns) -> "ChannelSchedule":
+        """Wrap existing column buffers (e.g. memoryviews over a snapshot) without copying"""
+        schedule = cls.__new__(cls)
+        schedule.channel_id = channel_id
+        schedule.pool = pool
+        schedule.starts = starts
+        schedule.ends = ends
+        schedule.columns = columns
+        return schedule
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def __iter__(self):
+        return (ProgramRow(self, i) for i in range(len(self.starts)))
+    
+    def append(self, start: int, end: int, **fields):
+        """Append a programme; text fields not given are stored as None"""
+        self.starts.append(start)
+        self.ends.append(end)
+        for field in PROGRAM_TEXT_FIELDS:
+            self.columns[field].append(self.pool.encode(fields.get(field)))
+    
+    def append_row(self, row: ProgramRow):
+        """Copy a row from another schedule, re-encoding strings if it uses a different pool"""
+        source = row.schedule
+        self.starts.append(row.start)
+        self.ends.append(row.end)
+        for field in PROGRAM_TEXT_FIELDS:
+            code = source.columns[field][row.index]
+            if source.pool is not self.pool:
+                code = self.pool.encode(source.pool.decode(code))
+            self.columns[field].append(code)
+    
+    def sort(self) -> Optional[List[int]]:
+        """Reorder all columns by start time; returns the applied permutation (None when already sorted)"""
+        starts = self.starts
+        if all(starts[i] <= starts[i + 1] for i in range(len(starts) - 1)):
+            return None
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        self.starts = array('q', (starts[i] for i in order))
+        self.ends = array('q', (self.ends[i] for i in order))
+        for field, column in self.columns.items():
+            self.columns[field] = array('i', (column[i] for i in order))
+        return order
+    
+    def overlaps(self, start_ts: float, end_ts: float) -> bool:
+        """Whether any programme airs within [start_ts, end_ts); assumes a normalized schedule"""
+        i = bisect.bisect_right(self.ends, start_ts)
+        return i < len(self.starts) and self.starts[i] < end_ts
+    
+    def window(self, start_ts: float, end_ts: float) -> List[ProgramRow]:
+        """Rows airing within [start_ts, end_ts); assumes a normalized (non-overlapping) schedule"""
+        rows = []
+        i = bisect.bisect_right(self.ends, start_ts)
+        starts = self.starts
+        while i < len(starts) and starts[i] < end_ts:
+            rows.append(ProgramRow(self, i))
+            i += 1
+        return rows
+    
+    def upcoming(self, now_ts: float, limit: Optional[int] = None) -> List[ProgramRow]:
+        """Rows that have not ended yet, in start order; assumes a normalized schedule"""
+        first = bisect.bisect_right(self.ends, now_ts)
+        last = len(self.ends) if limit is None else min(len(self.ends), first + limit)
+        return [ProgramRow(self, i) for i in range(first, last)]
+    
+    def to_models(self, rows: Optional[Iterable[ProgramRow]] = None, zone: ZoneRenderer = UTC_RENDERER) -> List[ChannelProgram]:
+        """Materialize pydantic models for the given rows (all rows by default), rendered in zone"""
+        rows = list(self) if rows is None else list(rows)
+        starts = zone.render_many([row.start for row in rows])
+        ends = zone.render_many([row.end for row in rows])
+        decode, columns = self.pool.decode, self.columns
+        return [
+            ChannelProgram(
+                start_time=start_time,
+                end_time=end_time,
+                channel_id=self.channel_id,
+                **{field: decode(columns[field][row.index]) for field in PROGRAM_TEXT_FIELDS}
+            )
+            for row, start_time, end_time in zip(rows, starts, ends)
+        ]
+
+class GuideStore:
+    """Compact in-memory guide: one ChannelSchedule per channel sharing a StringPool"""
+    def __init__(self):
+        self.pool = StringPool()
+        self.schedules: Dict[int, ChannelSchedule] = {}
+        self.revision = 0
+        self._rows = 0  # running total of rows across schedules
+        self._digest = (None, None)  # (revision, content digest)
+        self._channel_digests: Dict[int, bytes] = {}  # kept current by put()
+        self._encoded = (None, [b"\xff"])  # (pool, utf-8 of each string + NUL, with None's marker last)
+    
+    def new_schedule(self, channel_id: int) -> ChannelSchedule:
+        return ChannelSchedule(channel_id, self.pool)
+    
+    def get(self, channel_id: int) -> Optional[ChannelSchedule]:
+        return self.schedules.get(channel_id)
+    
+    def put(self, schedule: ChannelSchedule):
+        """Store (or replace) a channel's schedule"""
+        if schedule.pool is not self.pool:
+            self._reencode(schedule, self.pool)
+        self._store(schedule)
+        self._maybe_compact()
+    
+    def _store(self, schedule: ChannelSchedule):
+        schedule.sort()
+        replaced = self.schedules.get(schedule.channel_id)
+        self._rows += len(schedule) - (len(replaced) if replaced is not None else 0)
+        self.schedules[schedule.channel_id] = schedule
+        self._channel_digests[schedule.channel_id] = self._schedule_digest(schedule)
+        self.revision += 1
+    
+    def _maybe_compact(self):
+        # Replaced schedules leave dead strings behind; rebuild the pool once they dominate
+        if len(self.pool) > 4 * self._rows + 1024:
+            self.compact()
+    
+    def row_count(self) -> int:
+        return self._rows
+    
+    def digest(self) -> str:
+        """Hash of the stored guide's content (channels, times and text), stable across processes.
+        
+        Combines the per-channel hashes taken as schedules are stored, so it costs one step
+        per channel; re-putting identical data keeps the same digest.
+        """
+        if self._digest[0] != self.revision:
+            h = hashlib.blake2b(digest_size=10)
+            for channel_id in sorted(self._channel_digests):
+                h.update(self._channel_digests[channel_id])
+            self._digest = (self.revision, h.hexdigest())
+        return self._digest[1]
+    
+    def _schedule_digest(self, schedule: ChannelSchedule) -> bytes:
+        """Content hash of one stored schedule (its codes must belong to self.pool)"""
+        pool, encoded = self._encoded
+        if pool is not self.pool:
+            pool, encoded = self.pool, [b"\xff"]
+        if len(encoded) <= len(pool):
+            # Code -1 (None) indexes the marker, which stays at the end of the list
+            marker = encoded.pop()
+            encoded.extend(value.encode('utf-8') + b"\0" for value in pool.values()[len(encoded):])
+            encoded.append(marker)
+        self._encoded = (pool, encoded)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(struct.pack("<qq", schedule.channel_id, len(schedule)))
+        h.update(array('q', schedule.starts).tobytes())
+        h.update(array('q', schedule.ends).tobytes())
+        for field in PROGRAM_TEXT_FIELDS:
+            h.update(b"".join(map(encoded.__getitem__, schedule.columns[field])))
+        return h.digest()
+    
+    def compact(self):
+        """Re-encode all live schedules into a fresh pool, dropping unused strings"""
+        new_pool = StringPool()
+        for schedule in self.schedules.values():
+            self._reencode(schedule, new_pool)
+        self.pool = new_pool
+    
+    def load(self, schedules: Iterable[ChannelSchedule]):
+        """Copy schedules from another store (e.g. a mapped snapshot) into this one.
+        
+        Columns are copied whole; each source pool is translated once into a code map
+        instead of re-encoding row by row (and loading into an empty store keeps the codes).
+        """
+        code_maps = {}  # id(source pool) -> (source pool, source code -> our code, or None if unchanged)
+        for source in schedules:
+            entry = code_maps.get(id(source.pool))
+            if entry is None:
+                codes = self.pool.encode_all(source.pool.values())
+                # Code -1 (None) maps to itself through the last entry
+                entry = code_maps[id(source.pool)] = (
+                    source.pool, None if codes == list(range(len(codes))) else codes + [-1]
+                )
+            translate = entry[1].__getitem__ if entry[1] is not None else None
+            self._store(ChannelSchedule.from_columns(
+                source.channel_id, self.pool, array('q', source.starts.tobytes()), array('q', source.ends.tobytes()),
+                {field: array('i', column.tobytes() if translate is None else map(translate, column))
+                 for field, column in source.columns.items()}
+            ))
+        self._maybe_compact()
+    
+    @staticmethod
+    def _reencode(schedule: ChannelSchedule, pool: StringPool):
+        old_pool = schedule.pool
+        for field, column in schedule.columns.items():
+            schedule.columns[field] = array('i', (pool.encode(old_pool.decode(code)) for code in column))
+        schedule.pool = pool
+
+# Schedule Normalization
+# Run once per channel at ingest so clients always receive a clean, contiguous timeline.
+SCHEDULE_GAP_TOLERANCE = int(os.environ.get('SCHEDULE_GAP_TOLERANCE', '60'))  # seconds
+TBA_TITLE = "To be announced"
+
+def normalize_schedule(schedule: ChannelSchedule, priorities: Optional[List[int]] = None) -> ChannelSchedule:
+    """Sweep-line cleanup of one channel's programmes.
+    
+    - rows sharing a start time are deduped, keeping the highest priority one
+    - overlaps are clipped: the higher priority programme (on ties, the later one)
+      keeps its times and the other is shortened or dropped; a programme interrupted
+      by a shorter winner resumes after it
+    - gaps up to SCHEDULE_GAP_TOLERANCE extend the previous programme, longer gaps
+      are filled with "To be announced" blocks
+    
+    priorities are per row (higher wins, all equal by default). After sorting by start,
+    every row is pushed and popped at most once; resumed remainders wait in a small heap,
+    so clean feeds sweep in linear time.
+    """
+    order = schedule.sort()
+    if priorities is not None and order is not None:
+        priorities = [priorities[i] for i in order]
+    starts, ends = schedule.starts, schedule.ends
+    priority = priorities.__getitem__ if priorities is not None else (lambda i: 0)
+    kept: List[int] = []
+    kept_starts: List[int] = []
+    kept_ends: List[int] = []
+    kept_keys: List[tuple] = []  # (priority, original start): ties go to the later programme
+    resumed: List[tuple] = []  # heap of (start, end, original start, priority, row)
+    
+    i, n = 0, len(starts)
+    while i < n or resumed:
+        if resumed and (i >= n or resumed[0][0] <= starts[i]):
+            start, end, origin, rank, best = heapq.heappop(resumed)
+        else:
+            best, j = i, i + 1
+            while j < n and starts[j] == starts[i]:
+                if priority(j) > priority(best):
+                    best = j
+                j += 1
+            i = j
+            start, end, rank = starts[best], ends[best], priority(best)
+            origin = start
+        key = (rank, origin)
+        remainders = []
+        while kept and start < kept_ends[-1]:
+            if key >= kept_keys[-1]:
+                if kept_ends[-1] > end:
+                    # The clipped programme carries on once the winner is over
+                    remainders.append((max(kept_starts[-1], end), kept_ends[-1], kept_keys[-1][1], kept_keys[-1][0], kept[-1]))
+                kept_ends[-1] = start
+                if kept_ends[-1] > kept_starts[-1]:
+                    break
+                kept.pop()
+                kept_starts.pop()
+                kept_ends.pop()
+                kept_keys.pop()
+            else:
+                start = kept_ends[-1]
+                break
+        if end > start:
+            kept.append(best)
+            kept_starts.append(start)
+            kept_ends.append(end)
+            kept_keys.append(key)
+        for remainder in remainders:
+            heapq.heappush(resumed, remainder)
+    
+    result = ChannelSchedule(schedule.channel_id, schedule.pool)
+    for k, index in enumerate(kept):
+        start = kept_starts[k]
+        if k:
+            gap = start - result.ends[-1]
+            if gap > SCHEDULE_GAP_TOLERANCE:
+                gap_start = result.ends[-1]
+                result.append(gap_start, start, id=f"tba_{schedule.channel_id}_{gap_start}", title=TBA_TITLE)
+            elif gap > 0:
+                result.ends[-1] = start
+        result.starts.append(start)
+        result.ends.append(kept_ends[k])
+        for field, column in result.columns.items():
+            column.append(schedule.columns[field][index])
+    return result
+
+# Shared Guide Snapshot
+# One ingest process publishes the GuideStore as an immutable, versioned file that
+# every uvicorn worker memory-maps and reads in place. Layout (little endian):
+#   header | channel directory | string offsets | starts | ends | text columns | string blob
+SNAPSHOT_MAGIC = b"EPGSNAP1"
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_HEADER = struct.Struct("<8sIIqqq")  # magic, format, channels, revision, strings, rows
+SNAPSHOT_CHANNEL = struct.Struct("<qqq")  # channel id, first row, row count
+GUIDE_SNAPSHOT_PATH = Path(os.environ.get('GUIDE_SNAPSHOT_PATH', ROOT_DIR / 'data' / 'guide.snapshot'))
+# "local": each process fetches upstream itself; "snapshot": read the published snapshot
+GUIDE_SERVE_MODE = os.environ.get('GUIDE_SERVE_MODE', 'local')
+SNAPSHOT_CHECK_INTERVAL = float(os.environ.get('SNAPSHOT_CHECK_INTERVAL', '1.0'))
+
+def _pad8(length: int) -> int:
+    return (8 - length % 8) % 8
+
+def write_guide_snapshot(store: GuideStore, path: Path = GUIDE_SNAPSHOT_PATH) -> int:
+    """Publish the store to path atomically (write temp file, then rename). Returns the revision."""
+    schedules = [store.schedules[channel_id] for channel_id in sorted(store.schedules)]
+    pool = store.pool
+    strings = [value.encode('utf-8') for value in pool.values()]
+    rows = sum(len(schedule) for schedule in schedules)
+    revision = int(time.time() * 1000)
+    
+    offsets = array('q', [0])
+    for value in strings:
+        offsets.append(offsets[-1] + len(value))
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(schedules), revision, len(strings), rows))
+        first = 0
+        for schedule in schedules:
+            f.write(SNAPSHOT_CHANNEL.pack(schedule.channel_id, first, len(schedule)))
+            first += len(schedule)
+        f.write(offsets.tobytes())
+        for schedule in schedules:
+            f.write(array('q', schedule.starts).tobytes())
+        for schedule in schedules:
+            f.write(array('q', schedule.ends).tobytes())
+        for field in PROGRAM_TEXT_FIELDS:
+            for schedule in schedules:
+                f.write(array('i', schedule.columns[field]).tobytes())
+        f.write(b"\0" * _pad8(rows * 4 * len(PROGRAM_TEXT_FIELDS)))
+        for value in strings:
+            f.write(value)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.info(f"Published guide snapshot revision {revision} ({len(schedules)} channels, {rows} programs)")
+    return revision
+
+class MappedStringPool:
+    """Read-only StringPool over the string section of a mapped snapshot"""
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+    
+    def decode(self, code: int) -> Optional[str]:
+        if code < 0:
+            return None
+        return bytes(self._blob[self._offsets[code]:self._offsets[code + 1]]).decode('utf-8')
+    
+    def values(self) -> List[str]:
+        offsets = self._offsets.tolist()
+        blob = bytes(self._blob[:offsets[-1]])
+        return [blob[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+    
+    def __len__(self):
+        return len(self._offsets) - 1
+
+class GuideSnapshot:
+    """A memory-mapped, read-only view of a published guide snapshot"""
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, fmt, channel_count, self.revision, string_count, rows = SNAPSHOT_HEADER.unpack_from(view, 0)
+        if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported guide snapshot format in {path}")
+        
+        pos = SNAPSHOT_HEADER.size
+        directory = [SNAPSHOT_CHANNEL.unpack_from(view, pos + i * SNAPSHOT_CHANNEL.size) for i in range(channel_count)]
+        pos += channel_count * SNAPSHOT_CHANNEL.size
+        offsets = view[pos:pos + (string_count + 1) * 8].cast('q')
+        pos += (string_count + 1) * 8
+        starts = view[pos:pos + rows * 8].cast('q')
+        pos += rows * 8
+        ends = view[pos:pos + rows * 8].cast('q')
+        pos += rows * 8
+        text = {}
+        for field in PROGRAM_TEXT_FIELDS:
+            text[field] = view[pos:pos + rows * 4].cast('i')
+            pos += rows * 4
+        pos += _pad8(rows * 4 * len(PROGRAM_TEXT_FIELDS))
+        self.pool = MappedStringPool(offsets, view[pos:])
+        
+        self.schedules: Dict[int, ChannelSchedule] = {}
+        for channel_id, first, count in directory:
+            self.schedules[channel_id] = ChannelSchedule.from_columns(
+                channel_id, self.pool,
+                starts[first:first + count], ends[first:first + count],
+                {field: column[first:first + count] for field, column in text.items()}
+            )
+    
+    def get(self, channel_id: int) -> Optional[ChannelSchedule]:
+        return self.schedules.get(channel_id)
+
+class SnapshotReader:
+    """Tracks the published snapshot file and swaps in new revisions as they appear"""
+    def __init__(self, path: Path = GUIDE_SNAPSHOT_PATH):
+        self.path = path
+        self.snapshot: Optional[GuideSnapshot] = None
+        self._checked_at = 0.0
+    
+    def current(self) -> Optional[GuideSnapshot]:
+        now = time.monotonic()
+        if now - self._checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return self.snapshot
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self.snapshot
+        if self.snapshot is None or self.snapshot.identity != (stat.st_ino, stat.st_mtime_ns):
+            try:
+                # The previous mapping stays alive until responses using it are released
+                self.snapshot = GuideSnapshot(self.path)
+                logger.info(f"Loaded guide snapshot revision {self.snapshot.revision}")
+            except (OSError, ValueError, struct.error) as e:
+                logger.error(f"Error loading guide snapshot {self.path}: {e}")
+        return self.snapshot
+
+# Request Profiling
+# Admin-only, opt-in per request (X-Profile header) or by sampling rate. When ADMIN_TOKEN
+# is unset the middleware is not installed and profile_stage() returns a shared no-op.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_HISTORY = int(os.environ.get('PROFILE_HISTORY', '50'))
+
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar('current_profile', default=None)
+_stage_path: ContextVar[tuple] = ContextVar('stage_path', default=())
+_NULL_STAGE = contextlib.nullcontext()
+
+class RequestProfile:
+    """Wall and CPU time per (nested) stage of one request.
+    
+    CPU is event-loop thread time, so it includes other tasks that ran while this one
+    awaited; await time is reported as wall minus CPU.
+    """
+    def __init__(self, method: str, path: str, query: str):
+        self.id = str(uuid.uuid4())
+        self.method = method
+        self.path = path
+        self.query = query
+        self.started_at = datetime.utcnow()
+        self.status: Optional[int] = None
+        self.finished = False
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+        # stage path -> [calls, wall seconds, cpu seconds]
+        self.stages: Dict[tuple, list] = defaultdict(lambda: [0, 0.0, 0.0])
+    
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        path = _stage_path.get() + (name,)
+        token = _stage_path.set(path)
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            _stage_path.reset(token)
+            if not self.finished:
+                totals = self.stages[path]
+                totals[0] += 1
+                totals[1] += time.perf_counter() - wall0
+                totals[2] += time.thread_time() - cpu0
+    
+    def finish(self, status: Optional[int]):
+        self.status = status
+        self.wall = time.perf_counter() - self._wall0
+        self.cpu = time.thread_time() - self._cpu0
+        self.finished = True
+    
+    def folded(self, metric: str = "wall") -> List[str]:
+        """Collapsed-stack lines ("request;stage;substage microseconds") for flamegraph tools.
+        
+        Each line carries self time: the stage's total minus its direct children.
+        """
+        index = 1 if metric == "wall" else 2
+        totals = {path: values[index] for path, values in self.stages.items()}
+        root = (f"{self.method} {self.path}",)
+        totals[()] = self.wall if metric == "wall" else self.cpu
+        children = defaultdict(float)
+        for path, value in totals.items():
+            if path:
+                children[path[:-1]] += value
+        return [
+            f"{';'.join(root + path)} {max(0, int((value - children[path]) * 1e6))}"
+            for path, value in sorted(totals.items())
+        ]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "stages": [
+                {
+                    "stage": ";".join(path),
+                    "calls": calls,
+                    "wall_ms": round(wall * 1000, 3),
+                    "cpu_ms": round(cpu * 1000, 3),
+                    "await_ms": round(max(0.0, wall - cpu) * 1000, 3),
+                }
+                for path, (calls, wall, cpu) in sorted(self.stages.items())
+            ],
+        }
+
+profile_history: deque = deque(maxlen=PROFILE_HISTORY)
+
+def profile_stage(name: str):
+    """Time a stage of the current request when it is being profiled (no-op otherwise)"""
+    profile = current_profile.get()
+    return _NULL_STAGE if profile is None else profile.stage(name)
+
+def _admin_token_matches(token: Optional[str]) -> bool:
+    """Constant-time check of a presented admin token"""
+    if not ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+def _is_admin(headers: Dict[str, str]) -> bool:
+    return _admin_token_matches(headers.get('x-admin-token'))
+
+class ProfilingMiddleware:
+    """ASGI middleware that attaches a RequestProfile to opted-in or sampled requests"""
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = {key.decode('latin-1'): value.decode('latin-1') for key, value in scope.get("headers", [])}
+        requested = 'x-profile' in headers and _is_admin(headers)
+        if not requested and not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+            return await self.app(scope, receive, send)
+        
+        profile = RequestProfile(scope.get("method", ""), scope.get("path", ""), scope.get("query_string", b"").decode('latin-1'))
+        status = {}
+        
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message.setdefault("headers", []).append((b"x-profile-id", profile.id.encode()))
+            await send(message)
+        
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_profile.reset(token)
+            profile.finish(status.get("code"))
+            profile_history.append(profile)
+
+# IPTV-org catalogue ingest
+CATALOGUE_BATCH_SIZE = 500
+CATALOGUE_DEFAULT_FILTERS = {
+    'countries': [c for c in os.environ.get('IPTV_COUNTRIES', 'US').split(',') if c],
+    'categories': [c for c in os.environ.get('IPTV_CATEGORIES', '').split(',') if c],
+    'languages': [c for c in os.environ.get('IPTV_LANGUAGES', '').split(',') if c],
+}
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Incrementally decode the elements of a top-level JSON array from a byte stream.
+    
+    Only the current chunk and the partially received element are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    started = False
+    async for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Element not complete yet, wait for more data
+            # A number cut at a chunk boundary still decodes ("12" of "123"), so only accept
+            # an element once the delimiter after it has arrived
+            delimiter = end
+            while delimiter < len(buffer) and buffer[delimiter] in ' \t\r\n':
+                delimiter += 1
+            if delimiter >= len(buffer) or (delimiter == end and buffer[end] in '0123456789.eE+-'):
+                break  # Possibly a partial number; wait for more data
+            if buffer[delimiter] not in ',]':
+                raise ValueError("Expected ',' or ']' after a JSON array element")
+            pos = end
+            yield item
+        buffer = buffer[pos:]
+    # Reaching the end of the stream means the closing ']' never arrived
+    if not started:
+        raise ValueError("Expected a JSON array")
+    raise ValueError("JSON array is truncated")
+
 # EPG and Channel Management Service
+# Extra XMLTV feeds are opt-in: "name=url_template,..." (e.g. xmltv.org=https://.../{date}.xml)
+EPG_SOURCE_URLS = os.environ.get('EPG_SOURCE_URLS', '')
+
 class EPGService:
     def __init__(self):
         self.session = None
         # IPTV-org community channel sources
         self.channels_url = "https://iptv-org.github.io/api/channels.json"
         self.guides_url = "https://iptv-org.github.io/api/guides.json"
-        # Alternative EPG sources
-        self.epg_sources = [
-            "https://xmltv.org/",  # XMLTV format
-            "https://epg.streamlab.live/",  # Community EPG
-        ]
+        # Alternative EPG sources (e.g. xmltv.org, epg.streamlab.live), configured through
+        # EPG_SOURCE_URLS: name -> XMLTV feed URL template ({channel} and {date} optional)
+        self.epg_sources = dict(
+            entry.split('=', 1) for entry in EPG_SOURCE_URLS.split(',') if '=' in entry
+        )
     
     async def get_session(self):
         if self.session is None:
@@ -82,29 +910,111 @@ class EPGService:
         if self.session:
             await self.session.aclose()
     
-    async def fetch_iptv_channels(self):
-        """Fetch channel list from IPTV-org community"""
+    async def stream_json_array(self, url: str) -> AsyncIterator[Any]:
+        """Download a JSON array and yield its elements as they arrive"""
         session = await self.get_session()
+        async with session.stream("GET", url) as response:
+            if response.status_code != 200:
+                raise httpx.HTTPStatusError(f"IPTV-org API error: {response.status_code}", request=response.request, response=response)
+            async for item in iter_json_array(response.aiter_bytes()):
+                yield item
+    
+    async def iter_iptv_channels(self, countries=None, categories=None, languages=None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream IPTV-org channels, filtering by country/category/language while parsing"""
+        countries = {c.upper() for c in countries or []}
+        categories = {c.lower() for c in categories or []}
+        languages = {l.lower() for l in languages or []}
         
+        async for channel in self.stream_json_array(self.channels_url):
+            if not isinstance(channel, dict) or channel.get('is_nsfw') or channel.get('closed'):
+                continue
+            if countries and (channel.get('country') or '').upper() not in countries:
+                continue
+            if categories and not categories.intersection(c.lower() for c in channel.get('categories') or []):
+                continue
+            if languages and not languages.intersection(l.lower() for l in channel.get('languages') or []):
+                continue
+            yield channel
+    
+    async def fetch_iptv_channels(self, countries=None, categories=None, languages=None, limit: Optional[int] = 100):
+        """Fetch channel list from IPTV-org community"""
+        channels = []
         try:
-            response = await session.get(self.channels_url)
-            if response.status_code == 200:
-                channels_data = response.json()
-                logger.info(f"Fetched {len(channels_data)} channels from IPTV-org")
-                return channels_data[:100]  # Limit to first 100 channels
-            else:
-                logger.error(f"IPTV-org API error: {response.status_code}")
-                return []
+            async for channel in self.iter_iptv_channels(countries, categories, languages):
+                channels.append(channel)
+                if limit is not None and len(channels) >= limit:
+                    break
+            logger.info(f"Fetched {len(channels)} channels from IPTV-org")
         except Exception as e:
             logger.error(f"Error fetching IPTV channels: {e}")
-            return []
+        return channels
+    
+    async def ingest_catalogue(self, countries=None, categories=None, languages=None) -> Dict[str, Any]:
+        """Stream channels.json and guides.json into the persistent Mongo channel index.
+        
+        Channels are upserted in batches as they are parsed; guides are then joined
+        onto the kept channels, resolving epg.pw ids to epg_channel_id.
+        """
+        kept_ids = set()
+        batch = []
+        
+        async for channel in self.iter_iptv_channels(countries, categories, languages):
+            kept_ids.add(channel['id'])
+            names = [channel.get('name') or channel['id']] + list(channel.get('alt_names') or [])
+            doc = {
+                'name': names[0],
+                'alt_names': names[1:],
+                'search_names': [name.lower() for name in names],
+                'network': channel.get('network'),
+                'country': channel.get('country'),
+                'categories': channel.get('categories') or [],
+                'languages': channel.get('languages') or [],
+                'logo': channel.get('logo'),
+                'website': channel.get('website'),
+            }
+            # Guides are rebuilt from guides.json below; drop the previous ingest's entries
+            doc['guides'] = []
+            batch.append(UpdateOne({'_id': channel['id']}, {'$set': doc, '$unset': {'epg_channel_id': ''}}, upsert=True))
+            if len(batch) >= CATALOGUE_BATCH_SIZE:
+                await db.iptv_channels.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await db.iptv_channels.bulk_write(batch, ordered=False)
+            batch = []
+        
+        guides = 0
+        async for guide in self.stream_json_array(self.guides_url):
+            if not isinstance(guide, dict) or guide.get('channel') not in kept_ids:
+                continue
+            update = {'$addToSet': {'guides': {'site': guide.get('site'), 'site_id': guide.get('site_id'), 'lang': guide.get('lang')}}}
+            if guide.get('site') == 'epg.pw' and str(guide.get('site_id', '')).isdigit():
+                update['$set'] = {'epg_channel_id': int(guide['site_id'])}
+            batch.append(UpdateOne({'_id': guide['channel']}, update))
+            guides += 1
+            if len(batch) >= CATALOGUE_BATCH_SIZE:
+                await db.iptv_channels.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await db.iptv_channels.bulk_write(batch, ordered=False)
+        
+        await db.iptv_channels.create_index('search_names')
+        await db.iptv_channels.create_index([('country', 1), ('categories', 1)])
+        meta = {
+            'channels': len(kept_ids),
+            'guides': guides,
+            'filters': {'countries': countries or [], 'categories': categories or [], 'languages': languages or []},
+            'ingested_at': datetime.utcnow(),
+        }
+        await db.catalogue_meta.replace_one({'_id': 'iptv'}, meta, upsert=True)
+        logger.info(f"Ingested {len(kept_ids)} IPTV-org channels and {guides} guide entries")
+        return meta
     
-    async def generate_realistic_epg(self, channel_id: int, channel_name: str):
+    async def generate_realistic_epg(self, channel_id: int, channel_name: str) -> ChannelSchedule:
         """Generate realistic EPG data for a channel with varied timing"""
-        programs = []
+        programs = guide_store.new_schedule(channel_id)
         
         # Start EPG 3 hours before current time to show recent programs
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         base_time = now - timedelta(hours=3)
         base_time = base_time.replace(minute=0, second=0, microsecond=0)  # Round to hour
         
@@ -147,49 +1057,28 @@ class EPGService:
             if channel_type == "news":
                 # News: 30 min, 60 min programs
                 duration_options = [30, 60] 
-                # News often starts at :00 or :30
-                minute_starts = [0, 30]
             elif channel_type == "sports":
                 # Sports: 30 min, 90 min, 180 min (games can be long)
                 duration_options = [30, 90, 120, 180]
-                minute_starts = [0, 30]
             elif channel_type == "kids":
                 # Kids: 15 min, 30 min, 60 min
                 duration_options = [15, 30, 60]
-                minute_starts = [0, 15, 30, 45]
             elif channel_type == "entertainment":
                 # Entertainment: 30 min, 60 min, 120 min (movies)
                 duration_options = [30, 60, 90, 120]
-                minute_starts = [0, 30]
             else:
                 # Documentary/Lifestyle: 30 min, 60 min, 90 min
                 duration_options = [30, 60, 90]
-                minute_starts = [0, 30]
             
             # Choose duration for this program
             duration = duration_options[program_index % len(duration_options)]
             
-            # Adjust start time to realistic TV scheduling
-            if program_index == 0:
-                # First program starts at the base time
-                start_time = current_time
-            else:
-                # Subsequent programs start when previous ended, but adjust to realistic minute marks
-                preferred_minute = minute_starts[program_index % len(minute_starts)]
-                start_time = current_time.replace(minute=preferred_minute)
-                
-                # If the preferred minute has passed, move to next hour
-                if start_time <= current_time:
-                    start_time = start_time + timedelta(hours=1)
-            
-            end_time = start_time + timedelta(minutes=duration)
-            
-            # Don't exceed our 8-hour window
-            if end_time > end_time_limit:
-                end_time = end_time_limit
-                duration = int((end_time - start_time).total_seconds() / 60)
-                if duration < 15:  # Skip very short programs
-                    break
+            # Programs run back to back from the hour; durations keep starts on quarter-hour marks.
+            # Overlaps and gaps are resolved by normalize_schedule, like any other source.
+            start_time = current_time
+            end_time = min(start_time + timedelta(minutes=duration), end_time_limit)
+            if end_time - start_time < timedelta(minutes=15):  # Skip very short programs
+                break
             
             title = program_titles[program_index % len(program_titles)]
             
@@ -208,25 +1097,23 @@ class EPGService:
             
             description = descriptions.get(title, f"Watch {title} on {channel_name}. Quality programming with engaging content.")
             
-            program = ChannelProgram(
+            programs.append(
+                int(start_time.timestamp()),
+                int(end_time.timestamp()),
                 id=f"epg_{channel_id}_{program_index}",
                 title=title,
                 episode=f"Season {2024 + (program_index % 3)} Episode {program_index + 1}" if channel_type in ["entertainment", "kids"] else None,
-                start_time=start_time,
-                end_time=end_time,
                 description=description,
                 image=None,  # Will be populated with real images
                 rating="TV-14" if channel_type in ["news", "documentary"] else "TV-PG",
-                channel_id=channel_id,
                 genre=channel_type.title()
             )
-            programs.append(program)
             
             # Move to next program start time
             current_time = end_time
             program_index += 1
         
-        return programs
+        return normalize_schedule(programs)
 
 # EPG.PW API Service
 class EPGPWService:
@@ -254,7 +1141,7 @@ class EPGPWService:
         session = await self.get_session()
         
         if date is None:
-            date = datetime.now().strftime("%Y%m%d")
+            date = datetime.now(GUIDE_TIMEZONE).strftime("%Y%m%d")
         
         try:
             url = f"{self.base_url}/epg.xml"
@@ -278,9 +1165,9 @@ class EPGPWService:
             logger.error(f"Error fetching EPG XML data for channel {channel_id}: {e}")
             return ""
     
-    async def convert_epg_to_programs(self, xml_data: str, channel_id: int) -> List[ChannelProgram]:
-        """Convert EPG.PW XML data to ChannelProgram objects"""
-        programs = []
+    async def convert_epg_to_programs(self, xml_data: str, channel_id: int) -> ChannelSchedule:
+        """Convert EPG.PW XML data into a columnar ChannelSchedule"""
+        programs = guide_store.new_schedule(channel_id)
         
         if not xml_data:
             return programs
@@ -308,49 +1195,22 @@ class EPGPWService:
                     description = desc_elem.text if desc_elem is not None else 'No description available'
                     
                     if start_str and stop_str:
-                        # Parse start time "20250529000000 +0000"
-                        start_datetime_part = start_str.split(' ')[0]  # Get "20250529000000"
-                        start_year = int(start_datetime_part[:4])
-                        start_month = int(start_datetime_part[4:6])
-                        start_day = int(start_datetime_part[6:8])
-                        start_hour = int(start_datetime_part[8:10])
-                        start_minute = int(start_datetime_part[10:12])
-                        start_second = int(start_datetime_part[12:14])
-                        
-                        # Parse stop time "20250529003000 +0000"
-                        stop_datetime_part = stop_str.split(' ')[0]  # Get "20250529003000"
-                        stop_year = int(stop_datetime_part[:4])
-                        stop_month = int(stop_datetime_part[4:6])
-                        stop_day = int(stop_datetime_part[6:8])
-                        stop_hour = int(stop_datetime_part[8:10])
-                        stop_minute = int(stop_datetime_part[10:12])
-                        stop_second = int(stop_datetime_part[12:14])
-                        
-                        # Create datetime objects in UTC then convert to Eastern
-                        start_time_utc = datetime(start_year, start_month, start_day, start_hour, start_minute, start_second, tzinfo=pytz.UTC)
-                        stop_time_utc = datetime(stop_year, stop_month, stop_day, stop_hour, stop_minute, stop_second, tzinfo=pytz.UTC)
-                        
-                        start_time = start_time_utc.astimezone(pytz.timezone('America/New_York'))
-                        end_time = stop_time_utc.astimezone(pytz.timezone('America/New_York'))
-                        
                         # Clean up title
                         if 'Live:' in title:
                             title = title.replace('Live: ', '')
                         
-                        # Create program
-                        program = ChannelProgram(
+                        # Store as UTC epoch seconds; rendered in the viewer's zone at the API boundary
+                        programs.append(
+                            parse_xmltv_time(start_str),
+                            parse_xmltv_time(stop_str),
                             id=f"epgpw_{channel_id}_{start_str}",
                             title=title,
                             episode=None,
-                            start_time=start_time,
-                            end_time=end_time,
                             description=description,
                             image=None,  # EPG.PW doesn't provide images in XML
                             rating=None,
-                            channel_id=channel_id,
                             genre='News' if 'news' in title.lower() else 'General'
                         )
-                        programs.append(program)
                         
                 except Exception as e:
                     logger.error(f"Error processing XML programme entry: {e}")
@@ -363,6 +1223,221 @@ class EPGPWService:
         
         return programs
 
+def parse_xmltv_time(value: str) -> int:
+    """Parse an XMLTV timestamp ("20250529000000 +0000") into UTC epoch seconds"""
+    parts = value.split(' ')
+    stamp = parts[0]
+    seconds = calendar.timegm((
+        int(stamp[:4]), int(stamp[4:6]), int(stamp[6:8]),
+        int(stamp[8:10]), int(stamp[10:12]), int(stamp[12:14] or 0), 0, 0, 0
+    ))
+    if len(parts) > 1 and len(parts[1]) == 5:
+        offset = parts[1]
+        sign = -1 if offset[0] == '-' else 1
+        seconds -= sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+    return seconds
+
+# Channel Logo Proxy
+# Logos are fetched once, resized to the grid's display size and served from a local
+# disk cache. URLs carry a version derived from the upstream URL so they can be cached
+# by clients forever.
+LOGO_CACHE_DIR = Path(os.environ.get('LOGO_CACHE_DIR', ROOT_DIR / 'data' / 'logos'))
+LOGO_DEFAULT_WIDTH = 120  # 2x the largest logo box in App.css (60x30)
+LOGO_DEFAULT_HEIGHT = 60
+# Only these sizes are rendered (1x, 2x and 4x the logo box); other requests round up
+# to one of them, so arbitrary sizes can't multiply cache files
+LOGO_SIZES = ((60, 30), (LOGO_DEFAULT_WIDTH, LOGO_DEFAULT_HEIGHT), (240, 120))
+LOGO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def _load_pil_image():
+    """Pillow is optional; without it logos are proxied and cached at their original size"""
+    try:
+        from PIL import Image
+        return Image
+    except ImportError:
+        return None
+
+def logo_size(width: int, height: int) -> tuple:
+    """Smallest supported logo size covering width x height (the largest one otherwise)"""
+    for size in LOGO_SIZES:
+        if size[0] >= width and size[1] >= height:
+            return size
+    return LOGO_SIZES[-1]
+
+def logo_version(logo_url: str) -> str:
+    return hashlib.sha1(logo_url.encode('utf-8')).hexdigest()[:12]
+
+def logo_proxy_path(channel_id: int, logo_url: Optional[str]) -> Optional[str]:
+    if not logo_url:
+        return None
+    return f"/api/logos/{channel_id}?v={logo_version(logo_url)}"
+
+LOGO_MEDIA_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "gif": "image/gif", "webp": "image/webp"}
+LOGO_CACHE_SUFFIXES = (*LOGO_MEDIA_TYPES, "octet-stream")  # every suffix _cached can write
+
+def _sniff_image_type(data: bytes) -> str:
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+class LogoService:
+    def __init__(self):
+        self.session = None
+        self._paths: Dict[str, Path] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    async def get_session(self):
+        if self.session is None:
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
+                follow_redirects=True,
+                headers={
+                    'User-Agent': 'TV-EPG-App/1.0'
+                }
+            )
+        return self.session
+    
+    async def close_session(self):
+        if self.session:
+            await self.session.aclose()
+    
+    async def fetch_original(self, url: str) -> Optional[bytes]:
+        session = await self.get_session()
+        try:
+            response = await session.get(url)
+            if response.status_code == 200:
+                return response.content
+            logger.error(f"Logo fetch error: {response.status_code} for {url}")
+        except Exception as e:
+            logger.error(f"Error fetching logo {url}: {e}")
+        return None
+    
+    @staticmethod
+    def resize(data: bytes, width: int, height: int) -> tuple:
+        """Fit the image inside width x height and transcode to PNG. Returns (bytes, media type)."""
+        Image = _load_pil_image()
+        if Image is None:
+            return data, _sniff_image_type(data)
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGBA")
+            image.thumbnail((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format="PNG", optimize=True)
+        return out.getvalue(), "image/png"
+    
+    async def _cached(self, key: str, build) -> Optional[Path]:
+        """Return the cached file for key, building it once under a per-key lock"""
+        path = self._paths.get(key)
+        if path is not None:
+            return path
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Exact names only: a glob would also match another process's in-flight .tmp file
+            for suffix in LOGO_CACHE_SUFFIXES:
+                path = LOGO_CACHE_DIR / f"{key}.{suffix}"
+                if path.exists():
+                    self._paths[key] = path
+                    return path
+            result = await build()
+            if result is None:
+                return None
+            data, media_type = result
+            path = LOGO_CACHE_DIR / f"{key}.{media_type.split('/')[-1]}"
+            LOGO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._paths[key] = path
+            self._locks.pop(key, None)
+            return path
+    
+    async def get_original(self, logo_url: str) -> Optional[Path]:
+        """The upstream logo as downloaded, fetched once per logo version"""
+        async def build():
+            data = await self.fetch_original(logo_url)
+            if data is None:
+                return None
+            return data, _sniff_image_type(data)
+        
+        return await self._cached(f"{logo_version(logo_url)}_original", build)
+    
+    async def get_logo(self, logo_url: str, width: int, height: int) -> Optional[Path]:
+        """Cached, resized copy of a logo on disk (None if the upstream is unavailable)"""
+        async def build():
+            original = await self.get_original(logo_url)
+            if original is None:
+                return None
+            data = original.read_bytes()
+            try:
+                return await asyncio.to_thread(self.resize, data, width, height)
+            except Exception as e:
+                logger.error(f"Error resizing logo {logo_url}: {e}")
+                return data, _sniff_image_type(data)
+        
+        return await self._cached(f"{logo_version(logo_url)}_{width}x{height}", build)
+    
+    async def get_sprite(self, channels: List[Channel], width: int, height: int) -> Optional[Dict[str, Any]]:
+        """Pack the lineup's logos into one atlas image. Returns the manifest, or None without Pillow."""
+        Image = _load_pil_image()
+        if Image is None:
+            return None
+        channels = [channel for channel in channels if channel.logo_url]
+        columns = max(1, math.ceil(math.sqrt(len(channels))))
+        rows = max(1, math.ceil(len(channels) / columns))
+        signature = "|".join(f"{channel.id}:{channel.logo_url}" for channel in channels)
+        key = f"sprite_{hashlib.sha1(signature.encode('utf-8')).hexdigest()[:12]}_{width}x{height}"
+        cells = {
+            str(channel.id): [(i % columns) * width, (i // columns) * height, width, height]
+            for i, channel in enumerate(channels)
+        }
+        
+        async def build():
+            logo_paths = await asyncio.gather(*(self.get_logo(channel.logo_url, width, height) for channel in channels))
+            missing = [channel.id for channel, path in zip(channels, logo_paths) if path is None]
+            if missing:
+                # The sprite is cached forever under its key; don't freeze empty cells into it
+                logger.warning(f"Logo sprite {key} not built, logos unavailable for channels {missing}")
+                return None
+            
+            def compose():
+                atlas = Image.new("RGBA", (columns * width, rows * height), (0, 0, 0, 0))
+                for (x, y, _, _), path in zip(cells.values(), logo_paths):
+                    with Image.open(path) as logo:
+                        logo = logo.convert("RGBA")
+                        logo.thumbnail((width, height), Image.LANCZOS)
+                        atlas.paste(logo, (x + (width - logo.width) // 2, y + (height - logo.height) // 2))
+                out = io.BytesIO()
+                atlas.save(out, format="PNG", optimize=True)
+                return out.getvalue(), "image/png"
+            
+            return await asyncio.to_thread(compose)
+        
+        if await self._cached(key, build) is None:
+            return None
+        return {
+            "image_url": f"/api/logos/sprite/{key}.png",
+            "width": columns * width,
+            "height": rows * height,
+            "cells": cells
+        }
+
+# Shared columnar guide storage
+guide_store = GuideStore()
+snapshot_reader = SnapshotReader()
+
+# Initialize logo proxy
+logo_service = LogoService()
+
+# Background IPTV-org catalogue ingest (one at a time)
+catalogue_ingest_task: Optional[asyncio.Task] = None
+
 # Initialize EPG.PW service
 epg_pw_service = EPGPWService()
 
@@ -420,7 +1495,11 @@ def generate_channels_data() -> List[Channel]:
         {"id": 30, "number": "120.1", "name": "Bravo", "logo": "💃", "logo_url": "https://upload.wikimedia.org/wikipedia/commons/thumb/6/64/Bravo_logo.svg/200px-Bravo_logo.svg.png", "epg_channel_id": 403555, "category": "Lifestyle"}
     ]
     
-    return [Channel(**channel) for channel in channels_data]
+    return [
+        Channel(logo_proxy_url=logo_proxy_path(channel["id"], channel.get("logo_url")),
+                xmltv_id=XMLTV_CHANNEL_IDS.get(channel["id"]), **channel)
+        for channel in channels_data
+    ]
 
 # In-memory storage for user preferences (in production, use database)
 user_favorites = set()  # Set of channel IDs
@@ -483,11 +1562,909 @@ def get_channels_by_category(category: str):
     else:
         return all_channels
 
+# Channel Popularity
+# View events update time-decayed counters in bounded memory: a count-min sketch
+# estimates every channel's score and a top-k set tracks the leaders. Decay is forward:
+# each view is weighted 2 ** (age of the landmark / half-life), so stored scores never
+# need rescaling on read and only get renormalized when the weights grow large.
+TRENDING_HALF_LIFE = float(os.environ.get('TRENDING_HALF_LIFE', '3600'))
+TRENDING_TOP_K = int(os.environ.get('TRENDING_TOP_K', '50'))
+TRENDING_SKETCH_WIDTH = 2048
+TRENDING_SKETCH_DEPTH = 4
+TRENDING_MAX_EXPONENT = 40  # renormalize before forward weights pass 2 ** 40
+
+class CountMinSketch:
+    """Count-min sketch with conservative update over float counters"""
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('d', bytes(8 * width)) for _ in range(depth)]
+    
+    def _cells(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self.depth).digest()
+        return [value % self.width for value in struct.unpack(f"<{self.depth}Q", digest)]
+    
+    def add(self, key: str, amount: float) -> float:
+        """Add amount to key and return its new estimate"""
+        cells = self._cells(key)
+        rows = self.rows
+        estimate = min(rows[d][cell] for d, cell in enumerate(cells)) + amount
+        # Conservative update: only raise counters that would otherwise underestimate
+        for d, cell in enumerate(cells):
+            if rows[d][cell] < estimate:
+                rows[d][cell] = estimate
+        return estimate
+    
+    def estimate(self, key: str) -> float:
+        return min(self.rows[d][cell] for d, cell in enumerate(self._cells(key)))
+    
+    def scale(self, factor: float):
+        for row in self.rows:
+            for i in range(len(row)):
+                row[i] *= factor
+
+class PopularityTracker:
+    """Time-decayed view counts: count-min sketch estimates plus an incrementally maintained top-k"""
+    def __init__(self, half_life: float = TRENDING_HALF_LIFE, top_k: int = TRENDING_TOP_K):
+        self.half_life = half_life
+        self.top_k = top_k
+        self.sketch = CountMinSketch(TRENDING_SKETCH_WIDTH, TRENDING_SKETCH_DEPTH)
+        self.landmark = time.time()
+        self.events = 0
+        # Top-k members -> forward-weighted score, with a lazily invalidated min-heap over them
+        self._top: Dict[str, float] = {}
+        self._heap: List[tuple] = []
+    
+    def _weight(self, now: float) -> float:
+        return 2.0 ** ((now - self.landmark) / self.half_life)
+    
+    def _decay(self, now: float) -> float:
+        """1 / _weight(now), computed directly so a long-idle landmark underflows instead of overflowing"""
+        return 2.0 ** ((self.landmark - now) / self.half_life)
+    
+    def _renormalize(self, now: float):
+        factor = self._decay(now)
+        self.sketch.scale(factor)
+        self._top = {key: score * factor for key, score in self._top.items()}
+        self._rebuild_heap()
+        self.landmark = now
+    
+    def _rebuild_heap(self):
+        self._heap = [(score, key) for key, score in self._top.items()]
+        heapq.heapify(self._heap)
+    
+    def record(self, key: Any, now: Optional[float] = None):
+        """Count one view (O(depth + log k))"""
+        now = time.time() if now is None else now
+        if (now - self.landmark) / self.half_life > TRENDING_MAX_EXPONENT:
+            self._renormalize(now)
+        weight = self._weight(now)
+        key = str(key)
+        score = self.sketch.add(key, weight)
+        self.events += 1
+        top = self._top
+        if key not in top and len(top) >= self.top_k:
+            # Evict the current minimum if the new key beats it
+            while self._heap[0][0] != top.get(self._heap[0][1]):
+                heapq.heappop(self._heap)
+            if score <= self._heap[0][0]:
+                return
+            _, evicted = heapq.heappop(self._heap)
+            del top[evicted]
+        top[key] = score
+        heapq.heappush(self._heap, (score, key))
+        if len(self._heap) > 4 * self.top_k:
+            self._rebuild_heap()
+    
+    def score(self, key: Any, now: Optional[float] = None) -> float:
+        """Decayed view count estimate for any key"""
+        now = time.time() if now is None else now
+        return self.sketch.estimate(str(key)) * self._decay(now)
+    
+    def top(self, limit: Optional[int] = None, now: Optional[float] = None) -> List[tuple]:
+        """(key, decayed score) for the leaders, highest first"""
+        now = time.time() if now is None else now
+        decay = self._decay(now)
+        leaders = sorted(self._top.items(), key=lambda item: -item[1])[:limit]
+        return [(key, score * decay) for key, score in leaders]
+
+channel_popularity = PopularityTracker()
+
+# Guide horizon: per-channel day segments fetched lazily when a requested window touches them.
+# GUIDE_TIMEZONE only sets the upstream day boundaries; responses are rendered per viewer.
+GUIDE_TIMEZONE = pytz.timezone(os.environ.get('GUIDE_TIMEZONE', 'America/New_York'))
+GUIDE_HORIZON_PAST_DAYS = int(os.environ.get('GUIDE_HORIZON_PAST_DAYS', '1'))
+GUIDE_HORIZON_FUTURE_DAYS = int(os.environ.get('GUIDE_HORIZON_FUTURE_DAYS', '7'))
+GUIDE_WINDOW_HOURS = int(os.environ.get('GUIDE_WINDOW_HOURS', '12'))
+GUIDE_SEGMENT_TTL = float(os.environ.get('GUIDE_SEGMENT_TTL', str(6 * 3600)))
+GUIDE_SEGMENT_RETRY = float(os.environ.get('GUIDE_SEGMENT_RETRY', '300'))
+GUIDE_FETCH_CONCURRENCY = int(os.environ.get('GUIDE_FETCH_CONCURRENCY', '10'))
+
+def horizon_days(now: Optional[datetime] = None) -> List[str]:
+    """Guide-timezone dates (YYYYMMDD) covered by the configured horizon"""
+    today = (now or datetime.now(GUIDE_TIMEZONE)).astimezone(GUIDE_TIMEZONE).date()
+    return [(today + timedelta(days=offset)).strftime("%Y%m%d")
+            for offset in range(-GUIDE_HORIZON_PAST_DAYS, GUIDE_HORIZON_FUTURE_DAYS + 1)]
+
+def day_bounds(day: str) -> tuple:
+    """UTC epoch bounds of one guide-timezone date (YYYYMMDD)"""
+    first = GUIDE_TIMEZONE.localize(datetime.strptime(day, "%Y%m%d"))
+    last = GUIDE_TIMEZONE.localize(datetime.strptime(day, "%Y%m%d") + timedelta(days=1))
+    return first.timestamp(), last.timestamp()
+
+def horizon_bounds() -> tuple:
+    """UTC epoch bounds of the whole horizon"""
+    days = horizon_days()
+    return day_bounds(days[0])[0], day_bounds(days[-1])[1]
+
+def days_for_window(start_ts: float, end_ts: float) -> List[str]:
+    """Guide-timezone dates touched by [start_ts, end_ts), clamped to the horizon"""
+    day = datetime.fromtimestamp(start_ts, GUIDE_TIMEZONE).date()
+    last = datetime.fromtimestamp(max(start_ts, end_ts - 1), GUIDE_TIMEZONE).date()
+    allowed = set(horizon_days())
+    days = []
+    while day <= last:
+        key = day.strftime("%Y%m%d")
+        if key in allowed:
+            days.append(key)
+        day += timedelta(days=1)
+    return days
+
+# Guide Sources
+# Each channel maps to one or more providers, each with a priority. Every source is
+# fetched in parallel per day segment and the results are merged per channel, so losing
+# one provider thins the guide instead of dropping it to sample data.
+EPG_SOURCE_PRIORITIES = os.environ.get('EPG_SOURCE_PRIORITIES', 'epg.pw=30,xmltv.org=20,epg.streamlab.live=10')
+SOURCE_LATENCY_SAMPLES = 200
+MERGE_FILL_FIELDS = ("episode", "description", "image", "rating", "genre")
+# Filler values some providers emit instead of leaving a field empty
+MERGE_PLACEHOLDERS = ("No description available", "General")
+
+# XMLTV channel ids (iptv-org convention). Broadcast networks are left out because their
+# feeds are per local affiliate.
+XMLTV_CHANNEL_IDS = {
+    6: "ESPN.us", 13: "ESPN2.us", 21: "FS1.us", 22: "NFLNetwork.us",
+    7: "CNN.us", 11: "FoxNewsChannel.us", 12: "MSNBC.us",
+    14: "DisneyChannel.us", 15: "Nickelodeon.us", 16: "CartoonNetwork.us", 23: "DisneyJunior.us",
+    8: "TNT.us", 9: "TBS.us", 10: "USANetwork.us", 24: "FX.us", 25: "AMC.us",
+    26: "HBO.us", 27: "Showtime.us", 28: "Starz.us",
+    17: "DiscoveryChannel.us", 18: "History.us", 19: "NationalGeographic.us",
+    20: "FoodNetwork.us", 29: "HGTV.us", 30: "Bravo.us",
+}
+# Per-channel overrides of source priorities: channel id -> source name -> priority
+CHANNEL_SOURCE_PRIORITIES: Dict[int, Dict[str, int]] = {}
+
+class SourceStats:
+    """Latency and coverage counters for one guide source"""
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.programs = 0
+        self.latencies = deque(maxlen=SOURCE_LATENCY_SAMPLES)
+        # (channel id, day) -> programmes returned by the latest fetch
+        self.coverage: Dict[tuple, int] = {}
+    
+    def record_request(self, seconds: float, error: bool = False):
+        """One upstream request"""
+        self.requests += 1
+        self.errors += error
+        self.latencies.append(seconds)
+    
+    def record_segment(self, channel_id: int, day: str, rows: int):
+        """One channel-day segment produced by the source"""
+        self.programs += rows
+        self.coverage[(channel_id, day)] = rows
+    
+    def to_dict(self) -> Dict[str, Any]:
+        allowed = set(horizon_days())
+        for key in [key for key in self.coverage if key[1] not in allowed]:
+            del self.coverage[key]
+        mapped = {channel_id for channel_id, _ in self.coverage}
+        covered = {channel_id for (channel_id, _), rows in self.coverage.items() if rows}
+        segments = len(self.coverage)
+        latencies = sorted(self.latencies)
+        percentile = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else None
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "programs": self.programs,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)},
+            "channels_mapped": len(mapped),
+            "channels_covered": len(covered),
+            "segments_covered": sum(1 for rows in self.coverage.values() if rows),
+            "segments": segments,
+            "coverage": round(len(covered) / len(mapped), 3) if mapped else None,
+        }
+
+class EPGSource(ABC):
+    """A guide provider that returns one channel's programmes for one guide day"""
+    def __init__(self, name: str, priority: int):
+        self.name = name
+        self.priority = priority
+        self.stats = SourceStats()
+        self._semaphore = asyncio.Semaphore(GUIDE_FETCH_CONCURRENCY)
+    
+    @abstractmethod
+    def channel_ref(self, channel: Channel) -> Optional[str]:
+        """The provider's id for a channel, or None when the channel isn't mapped"""
+    
+    @abstractmethod
+    async def fetch(self, channel: Channel, ref: str, day: str) -> ChannelSchedule:
+        """Programmes airing on the channel during the guide day; may raise on upstream errors"""
+    
+    async def load(self, channel: Channel, ref: str, day: str) -> ChannelSchedule:
+        """fetch() with per-source concurrency and coverage accounting; errors yield an empty segment"""
+        async with self._semaphore:
+            try:
+                segment = await self.fetch(channel, ref, day)
+            except Exception as e:
+                logger.error(f"Error fetching {self.name} guide for {channel.name} on {day}: {e}")
+                segment = guide_store.new_schedule(channel.id)
+        self.stats.record_segment(channel.id, day, len(segment))
+        return segment
+    
+    async def close_session(self):
+        pass
+
+class EPGPWSource(EPGSource):
+    """epg.pw, one request per channel and day"""
+    def channel_ref(self, channel: Channel) -> Optional[str]:
+        return str(channel.epg_channel_id) if channel.epg_channel_id else None
+    
+    async def fetch(self, channel: Channel, ref: str, day: str) -> ChannelSchedule:
+        logger.info(f"Fetching EPG data for {channel.name} (ID: {ref}) on {day}")
+        started = time.perf_counter()
+        with profile_stage("fetch"):
+            xml_data = await epg_pw_service.get_epg_data(int(ref), day)
+        # get_epg_data returns "" on any upstream failure
+        self.stats.record_request(time.perf_counter() - started, error=not xml_data)
+        with profile_stage("parse"):
+            return await epg_pw_service.convert_epg_to_programs(xml_data, channel.id)
+
+class XMLTVFeedSource(EPGSource):
+    """A plain XMLTV feed. The URL template may use {channel} and {date}; a feed URL that
+    several channels or days share is downloaded and parsed once per GUIDE_SEGMENT_TTL."""
+    def __init__(self, name: str, url_template: str, priority: int):
+        super().__init__(name, priority)
+        self.url_template = url_template
+        self.id_prefix = re.sub(r'[^a-z0-9]+', '', name.lower())
+        self.session = None
+        # url -> (expires_at, {xmltv channel id: sorted programme tuples}); failures cache {} briefly
+        self._feeds: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def get_session(self):
+        if self.session is None:
+            self.session = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                follow_redirects=True,
+                headers={'User-Agent': 'TV-EPG-App/1.0'}
+            )
+        return self.session
+    
+    async def close_session(self):
+        if self.session:
+            await self.session.aclose()
+    
+    def channel_ref(self, channel: Channel) -> Optional[str]:
+        return channel.xmltv_id
+    
+    async def _download(self, url: str) -> Dict[str, list]:
+        session = await self.get_session()
+        started = time.perf_counter()
+        try:
+            # Whole-host feeds run to tens of MB: spool the body to disk and parse it off the event loop
+            with tempfile.TemporaryFile() as body:
+                with profile_stage("fetch"):
+                    async with session.stream("GET", url) as response:
+                        response.raise_for_status()
+                        async for chunk in response.aiter_bytes():
+                            body.write(chunk)
+                self.stats.record_request(time.perf_counter() - started)
+                body.seek(0)
+                with profile_stage("parse"):
+                    index = await asyncio.to_thread(parse_xmltv_feed, body, set(XMLTV_CHANNEL_IDS.values()))
+            logger.info(f"Fetched {self.name} feed with {len(index)} mapped channels")
+            expires_at = time.monotonic() + GUIDE_SEGMENT_TTL
+        except Exception as e:
+            if isinstance(e, httpx.HTTPError):
+                self.stats.record_request(time.perf_counter() - started, error=True)
+            logger.error(f"Error fetching {self.name} feed {url}: {e}")
+            index, expires_at = {}, time.monotonic() + GUIDE_SEGMENT_RETRY
+        self._feeds[url] = (expires_at, index)
+        # Forget expired feeds, e.g. past days of a per-date URL template
+        for stale_url in [key for key, (expiry, _) in self._feeds.items() if expiry <= time.monotonic()]:
+            del self._feeds[stale_url]
+        return index
+    
+    async def _feed(self, url: str) -> Dict[str, list]:
+        entry = self._feeds.get(url)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        # Channels and days sharing a feed URL share one download
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url))
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+            self._inflight[url] = task
+        return await asyncio.shield(task)
+    
+    async def fetch(self, channel: Channel, ref: str, day: str) -> ChannelSchedule:
+        index = await self._feed(self.url_template.format(channel=ref, date=day))
+        programmes = index.get(ref, [])
+        first, last = day_bounds(day)
+        segment = guide_store.new_schedule(channel.id)
+        i = bisect.bisect_left(programmes, (first,))
+        while i < len(programmes) and programmes[i][0] < last:
+            start, end, title, episode, description, image, rating, genre = programmes[i]
+            segment.append(start, end, id=f"{self.id_prefix}_{channel.id}_{start}", title=title, episode=episode,
+                           description=description, image=image, rating=rating, genre=genre)
+            i += 1
+        return segment
+
+def parse_xmltv_feed(source, wanted: set) -> Dict[str, list]:
+    """Programmes of the wanted channels in an XMLTV file object (plain or gzipped), as start-sorted
+    tuples per channel. Parses incrementally; blocking, so run it in a thread."""
+    import xml.etree.ElementTree as ET
+    
+    if source.read(2) == b"\x1f\x8b":
+        source.seek(0)
+        source = gzip.GzipFile(fileobj=source)  # .xml.gz feeds
+    else:
+        source.seek(0)
+    
+    def child_text(element, tag):
+        child = element.find(tag)
+        return child.text.strip() if child is not None and child.text else None
+    
+    index = defaultdict(list)
+    root = None
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != 'end' or element.tag != 'programme':
+            continue
+        channel = element.get('channel')
+        if channel in wanted and element.get('start') and element.get('stop'):
+            try:
+                icon = element.find('icon')
+                index[channel].append((
+                    parse_xmltv_time(element.get('start')),
+                    parse_xmltv_time(element.get('stop')),
+                    child_text(element, 'title') or 'Unknown Program',
+                    child_text(element, 'sub-title'),
+                    child_text(element, 'desc'),
+                    icon.get('src') if icon is not None else None,
+                    child_text(element, 'rating/value'),
+                    child_text(element, 'category'),
+                ))
+            except (ValueError, IndexError) as e:
+                logger.error(f"Error processing XML programme entry: {e}")
+        root.clear()  # Drop parsed programmes so memory stays flat
+    for programmes in index.values():
+        programmes.sort()
+    return dict(index)
+
+def build_epg_sources() -> List[EPGSource]:
+    """epg.pw plus the XMLTV feeds in EPGService.epg_sources, with EPG_SOURCE_PRIORITIES applied"""
+    priorities = {}
+    for entry in EPG_SOURCE_PRIORITIES.split(','):
+        if '=' in entry:
+            name, value = entry.split('=', 1)
+            priorities[name.strip()] = int(value)
+    sources: List[EPGSource] = [EPGPWSource("epg.pw", priorities.get("epg.pw", 0))]
+    for name, url_template in epg_service.epg_sources.items():
+        sources.append(XMLTVFeedSource(name.strip(), url_template.strip(), priorities.get(name.strip(), 0)))
+    return sources
+
+epg_sources = build_epg_sources()
+
+def channel_sources(channel: Channel) -> List[tuple]:
+    """(source, provider channel id, priority) for every source that maps the channel"""
+    overrides = CHANNEL_SOURCE_PRIORITIES.get(channel.id, {})
+    mapped = []
+    for source in epg_sources:
+        ref = source.channel_ref(channel)
+        if ref:
+            mapped.append((source, ref, overrides.get(source.name, source.priority)))
+    return mapped
+
+def merge_sources(channel_id: int, segments: List[tuple]) -> ChannelSchedule:
+    """Merge (priority, segment) pairs from several sources into one normalized schedule.
+    
+    Programmes with the same start and title are one programme: the highest priority
+    copy is kept and its empty or placeholder fields are filled from the others.
+    Remaining conflicts are resolved by priority in normalize_schedule.
+    """
+    merged = guide_store.new_schedule(channel_id)
+    missing = {-1} | {merged.pool.encode(value) for value in MERGE_PLACEHOLDERS}
+    priorities: List[int] = []
+    seen: Dict[tuple, int] = {}
+    for priority, segment in sorted(segments, key=lambda entry: -entry[0]):
+        for row in segment:
+            key = (row.start, (row.text("title") or "").casefold())
+            index = seen.get(key)
+            if index is None:
+                seen[key] = len(merged)
+                merged.append_row(row)
+                priorities.append(priority)
+                continue
+            for field in MERGE_FILL_FIELDS:
+                column = merged.columns[field]
+                if column[index] in missing:
+                    value = row.text(field)
+                    if value is not None and value not in MERGE_PLACEHOLDERS:
+                        column[index] = merged.pool.encode(value)
+    return normalize_schedule(merged, priorities)
+
+class GuideLoader:
+    """Loads per-channel, per-source day segments in parallel and merges them into guide_store"""
+    def __init__(self):
+        # channel id -> (day, source name) -> (fetched_at, segment)
+        self.segments: Dict[int, Dict[tuple, tuple]] = {}
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._background = set()
+    
+    def _is_fresh(self, channel_id: int, key: tuple, now: float) -> bool:
+        entry = self.segments.get(channel_id, {}).get(key)
+        if entry is None:
+            return False
+        fetched_at, segment = entry
+        return now - fetched_at < (GUIDE_SEGMENT_TTL if len(segment) else GUIDE_SEGMENT_RETRY)
+    
+    async def _fetch_segment(self, channel: Channel, source: EPGSource, ref: str, day: str) -> ChannelSchedule:
+        segment = await source.load(channel, ref, day)
+        segment.sort()
+        self.segments.setdefault(channel.id, {})[(day, source.name)] = (time.monotonic(), segment)
+        return segment
+    
+    def _load(self, channel: Channel, source: EPGSource, ref: str, day: str) -> asyncio.Task:
+        # Concurrent requests for the same segment share one upstream fetch
+        key = (channel.id, source.name, day)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_segment(channel, source, ref, day))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self._inflight[key] = task
+        return task
+    
+    def stitch(self, channel: Channel) -> ChannelSchedule:
+        """Merge a channel's day segments from every source into one normalized timeline.
+        
+        Programmes listed on both sides of midnight, or by several sources, share a
+        start time and are deduped by merge_sources.
+        """
+        priorities = {source.name: priority for source, _, priority in channel_sources(channel)}
+        segments = self.segments.get(channel.id, {})
+        return merge_sources(channel.id, [
+            (priorities.get(source_name, 0), segments[(day, source_name)][1])
+            for day, source_name in sorted(segments)
+        ])
+    
+    def _evict(self):
+        allowed = set(horizon_days())
+        for keys in self.segments.values():
+            for key in [key for key in keys if key[0] not in allowed]:
+                del keys[key]
+    
+    async def _refresh(self, channels: List[Channel], stale: Dict[int, List[tuple]]):
+        """Fetch the given stale (source, ref, day) segments in parallel and restitch the affected channels"""
+        pending = [self._load(channel, *segment) for channel in channels for segment in stale[channel.id]]
+        await asyncio.gather(*pending, return_exceptions=True)
+        for channel in channels:
+            schedule = self.stitch(channel)
+            if len(schedule):
+                guide_store.put(schedule)
+    
+    def _refresh_in_background(self, channels: List[Channel], stale: Dict[int, List[tuple]]):
+        task = asyncio.ensure_future(self._refresh(channels, stale))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    async def ensure_window(self, channels: List[Channel], start_ts: float, end_ts: float,
+                            wait_for_fresh: bool = False) -> Dict[int, ChannelSchedule]:
+        """Make sure every channel's programming covering the window is loaded.
+        
+        Missing or stale segments are fetched in parallel. Channels that already have
+        programming for the window (e.g. from a warm-start snapshot) are served as-is
+        and refreshed in the background unless wait_for_fresh is set; channels with no
+        real programming in the window fall back to realistic sample data.
+        """
+        self._evict()
+        days = days_for_window(start_ts, end_ts)
+        now = time.monotonic()
+        stale: Dict[int, List[tuple]] = {}
+        for channel in channels:
+            stale_segments = [
+                (source, ref, day)
+                for source, ref, _ in channel_sources(channel) for day in days
+                if not self._is_fresh(channel.id, (day, source.name), now)
+            ]
+            if stale_segments:
+                stale[channel.id] = stale_segments
+        
+        blocking, background = [], []
+        for channel in channels:
+            if channel.id in stale:
+                schedule = guide_store.get(channel.id)
+                has_window = schedule is not None and schedule.overlaps(start_ts, end_ts)
+                (background if has_window and not wait_for_fresh else blocking).append(channel)
+        if background:
+            self._refresh_in_background(background, stale)
+        if blocking:
+            await self._refresh(blocking, stale)
+        
+        schedules = {}
+        for channel in channels:
+            schedule = guide_store.get(channel.id)
+            if schedule is None or not schedule.overlaps(start_ts, end_ts):
+                # Sample data only fills this response; storing it would replace the channel's
+                # real guide (and end up in published snapshots)
+                schedule = generate_realistic_programs(channel.id, channel.name)
+                logger.info(f"No EPG data in window, using sample data for {channel.name}")
+            schedules[channel.id] = schedule
+        return schedules
+
+guide_loader = GuideLoader()
+
+async def run_guide_ingest(interval: float):
+    """Ingest loop for multi-worker serving: refresh every channel, then publish a snapshot"""
+    await warm_catalogue()
+    while True:
+        started = time.monotonic()
+        # The ingest process keeps the whole horizon loaded, not just the current window
+        await guide_loader.ensure_window(generate_channels_data(), *horizon_bounds(), wait_for_fresh=True)
+        guide_store.compact()
+        write_guide_snapshot(guide_store)
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+# Guide Export
+# XMLTV and M3U are generated as streams straight from the stored guide, one channel
+# per chunk. The first download of a guide revision is teed to disk and later requests
+# for the same revision are served from that file.
+EXPORT_CACHE_DIR = Path(os.environ.get('EXPORT_CACHE_DIR', ROOT_DIR / 'data' / 'exports'))
+M3U_STREAM_URL_TEMPLATE = os.environ.get('M3U_STREAM_URL_TEMPLATE', 'http://localhost/live/{channel_id}')
+
+def _xmltv_time(ts: int) -> str:
+    return time.strftime("%Y%m%d%H%M%S +0000", time.gmtime(ts))
+
+def current_guide() -> tuple:
+    """The stored guide to export: (revision label, channel id -> schedule)"""
+    if GUIDE_SERVE_MODE == 'snapshot':
+        snapshot = snapshot_reader.current()
+        return (f"s{snapshot.revision}", snapshot.schedules) if snapshot else ("s0", {})
+    # Content-derived, so cached artifacts survive restarts and no-op refreshes but never go stale
+    return f"l{guide_store.digest()}", dict(guide_store.schedules)
+
+async def iter_xmltv(channels: List[Channel], schedules: Dict[int, ChannelSchedule]) -> AsyncIterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE tv SYSTEM "xmltv.dtd">\n<tv generator-info-name="TV-EPG-App">\n'
+    parts = []
+    for channel in channels:
+        parts.append(f'  <channel id="{channel.id}">\n    <display-name>{xml_escape(channel.name)}</display-name>\n')
+        parts.append(f'    <display-name>{xml_escape(channel.number)}</display-name>\n')
+        if channel.logo_url:
+            parts.append(f'    <icon src={xml_quoteattr(channel.logo_url)} />\n')
+        parts.append('  </channel>\n')
+    yield "".join(parts)
+    for channel in channels:
+        schedule = schedules.get(channel.id)
+        if schedule is None:
+            continue
+        parts = []
+        for row in schedule:
+            parts.append(f'  <programme start="{_xmltv_time(row.start)}" stop="{_xmltv_time(row.end)}" channel="{channel.id}">\n')
+            parts.append(f'    <title lang="en">{xml_escape(row.text("title") or "")}</title>\n')
+            for field, tag in (("episode", "sub-title"), ("description", "desc")):
+                value = row.text(field)
+                if value:
+                    parts.append(f'    <{tag} lang="en">{xml_escape(value)}</{tag}>\n')
+            genre = row.text("genre")
+            if genre:
+                parts.append(f'    <category lang="en">{xml_escape(genre)}</category>\n')
+            image = row.text("image")
+            if image:
+                parts.append(f'    <icon src={xml_quoteattr(image)} />\n')
+            rating = row.text("rating")
+            if rating:
+                parts.append(f'    <rating system="VCHIP">\n      <value>{xml_escape(rating)}</value>\n    </rating>\n')
+            parts.append('  </programme>\n')
+        yield "".join(parts)
+        await asyncio.sleep(0)  # Let other requests run between channels
+    yield '</tv>\n'
+
+async def iter_m3u(channels: List[Channel], xmltv_url: str) -> AsyncIterator[str]:
+    yield f'#EXTM3U x-tvg-url="{xmltv_url}"\n'
+    for channel in channels:
+        name = channel.name.replace(',', ' ')
+        yield (
+            f'#EXTINF:-1 tvg-id="{channel.id}" tvg-chno="{channel.number}" tvg-name="{name}" '
+            f'tvg-logo="{channel.logo_url or ""}" group-title="{channel.category or "General"}",{name}\n'
+            f'{M3U_STREAM_URL_TEMPLATE.format(channel_id=channel.id, number=channel.number)}\n'
+        )
+
+async def tee_export(chunks: AsyncIterator[str], path: Path, compress: bool) -> AsyncIterator[bytes]:
+    """Encode (optionally gzip) a text stream, writing it to path once fully generated"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    completed = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            async for chunk in chunks:
+                data = chunk.encode('utf-8')
+                if compressor is not None:
+                    data = compressor.compress(data)
+                if data:
+                    f.write(data)
+                    yield data
+            if compressor is not None:
+                data = compressor.flush()
+                f.write(data)
+                yield data
+        os.replace(tmp_path, path)
+        completed = True
+        # Older revisions of the same export are no longer needed ("<kind>-<revision>-<filename>")
+        kind, _, filename = path.name.split('-', 2)
+        for old in path.parent.glob(f"{kind}-*-{filename}"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    finally:
+        if not completed:
+            tmp_path.unlink(missing_ok=True)
+
+def export_kind(export: str, channels: List[Channel], lineup: List[Channel]) -> str:
+    """Cache name for an export of channels: the resolved category, or "all" for the whole lineup.
+    
+    Derived from the filtered channels rather than the query, so unknown categories share
+    the full-lineup artifact instead of each writing their own.
+    """
+    if len(channels) == len(lineup):
+        return f"{export}_all"
+    categories = {re.sub(r'[^a-z0-9]', '', (channel.category or '').lower()) for channel in channels}
+    return f"{export}_{'_'.join(sorted(categories)) or 'none'}"
+
+def export_response(kind: str, filename: str, media_type: str, revision: str, chunks_factory, compress: bool):
+    """Serve the cached artifact for this revision, or stream and cache a new one"""
+    if compress:
+        filename, media_type = f"{filename}.gz", "application/gzip"
+    path = EXPORT_CACHE_DIR / f"{kind}-{revision}-{filename}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": f'"{kind}-{revision}-{int(compress)}"',
+        "X-Guide-Revision": revision,
+    }
+    if path.exists():
+        return FileResponse(path, media_type=media_type, headers=headers)
+    return StreamingResponse(tee_export(chunks_factory(), path, compress), media_type=media_type, headers=headers)
+
+# Server Push and Programme Reminders
+# Reminders live in Mongo; in memory the scheduler keeps only (fire time, programme id)
+# in a single heap, with one task sleeping until the earliest one is due. Cancelled
+# entries are dropped lazily when they reach the top of the heap.
+REMINDER_BATCH_SIZE = int(os.environ.get('REMINDER_BATCH_SIZE', '500'))
+EVENT_QUEUE_SIZE = 100
+EVENT_KEEPALIVE = 15.0
+
+class EventBroker:
+    """Fan-out of server-push events to connected /api/events clients"""
+    def __init__(self):
+        self._subscribers = set()
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+    
+    def publish(self, event: str, data: Any):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                logger.warning("Dropping server-push event for a slow client")
+
+class ReminderScheduler:
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._fire_at: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def __len__(self):
+        return len(self._fire_at)
+    
+    def schedule(self, program_id: str, fire_at: float):
+        """Add or reschedule a reminder (O(log n))"""
+        self._fire_at[program_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, program_id))
+        if self._heap[0] == (fire_at, program_id):
+            self._wakeup.set()  # New earliest reminder; re-arm the timer
+        self._compact()
+    
+    def cancel(self, program_id: str):
+        """Cancel a reminder; its heap entry is discarded when it surfaces"""
+        self._fire_at.pop(program_id, None)
+        self._compact()
+    
+    def _compact(self):
+        # Rebuild once stale entries dominate, keeping the heap proportional to live reminders
+        if len(self._heap) > 2 * len(self._fire_at) + 1024:
+            self._heap = [(fire_at, program_id) for program_id, fire_at in self._fire_at.items()]
+            heapq.heapify(self._heap)
+    
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < REMINDER_BATCH_SIZE:
+            fire_at, program_id = heapq.heappop(self._heap)
+            if self._fire_at.get(program_id) == fire_at:
+                del self._fire_at[program_id]
+                due.append(program_id)
+        return due
+    
+    async def _load(self):
+        """Load pending reminders from Mongo with a single heapify"""
+        # Serves this query and the pending list in get_reminders (fired=False, sorted by fire_at)
+        await db.reminders.create_index([("fired", 1), ("fire_at", 1)])
+        cursor = db.reminders.find({"fired": False}, {"fire_at": 1})
+        async for doc in cursor:
+            self._fire_at.setdefault(doc["_id"], doc["fire_at"])
+        self._heap = [(fire_at, program_id) for program_id, fire_at in self._fire_at.items()]
+        heapq.heapify(self._heap)
+        logger.info(f"Loaded {len(self._fire_at)} pending reminders")
+    
+    async def _fire(self, program_ids: List[str]):
+        try:
+            docs = await db.reminders.find({"_id": {"$in": program_ids}}).to_list(len(program_ids))
+            event_broker.publish("reminders", [
+                {
+                    "program_id": doc["_id"],
+                    "channel_id": doc["channel_id"],
+                    "title": doc["title"],
+                    "start_time": UTC_RENDERER.render(doc["start"]).isoformat(),
+                    "lead_minutes": doc["lead_minutes"],
+                }
+                for doc in docs
+            ])
+            await db.reminders.update_many({"_id": {"$in": program_ids}}, {"$set": {"fired": True, "fired_at": datetime.utcnow()}})
+        except Exception as e:
+            logger.error(f"Error firing {len(program_ids)} reminders: {e}")
+    
+    async def run(self):
+        try:
+            await self._load()
+        except Exception as e:
+            logger.error(f"Error loading reminders: {e}")
+        while True:
+            self._wakeup.clear()
+            due = self._pop_due(time.time())
+            if due:
+                await self._fire(due)
+                continue
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+event_broker = EventBroker()
+reminder_scheduler = ReminderScheduler()
+
+def require_reminders():
+    """Reminders and server push live in one process; multi-worker (snapshot) serving can't offer them"""
+    if GUIDE_SERVE_MODE == 'snapshot':
+        raise HTTPException(status_code=501, detail="Reminders are not available with multi-worker serving")
+
+def find_program(channel: Channel, program_id: str) -> Optional[ProgramRow]:
+    """Look up a programme in the stored guide for a channel"""
+    if GUIDE_SERVE_MODE == 'snapshot':
+        snapshot = snapshot_reader.current()
+        schedule = snapshot.get(channel.id) if snapshot else None
+    else:
+        schedule = guide_store.get(channel.id)
+    if schedule is None:
+        return None
+    return next((row for row in schedule if row.text("id") == program_id), None)
+
+# Warm start and readiness
+# On boot the last persisted snapshot is loaded so the first requests serve real data,
+# while the current window is refreshed from upstream in the background.
+readiness = {"catalogue": False, "guide": False, "snapshot_revision": None, "started_at": time.time()}
+CATALOGUE_CHECK_TIMEOUT = 2.0  # keep readiness probes fast when Mongo is unreachable
+
+async def warm_guide():
+    """Refresh the current window for the whole lineup, then persist a snapshot for the next boot"""
+    try:
+        now_ts = time.time()
+        await guide_loader.ensure_window(generate_channels_data(), now_ts, now_ts + GUIDE_WINDOW_HOURS * 3600,
+                                         wait_for_fresh=True)
+        readiness["guide"] = True
+        readiness["snapshot_revision"] = write_guide_snapshot(guide_store)
+    except Exception as e:
+        logger.error(f"Error warming guide: {e}")
+
+async def catalogue_ready() -> bool:
+    """Whether an IPTV-org catalogue ingest has completed (recorded in catalogue_meta)"""
+    if not readiness["catalogue"]:
+        try:
+            meta = await asyncio.wait_for(
+                db.catalogue_meta.find_one({'_id': 'iptv', 'ingested_at': {'$exists': True}}),
+                CATALOGUE_CHECK_TIMEOUT
+            )
+            readiness["catalogue"] = meta is not None
+        except Exception as e:
+            logger.error(f"Error checking catalogue state: {e}")
+    return readiness["catalogue"]
+
+async def warm_catalogue():
+    """Start an ingest on first boot if the catalogue has never been ingested"""
+    global catalogue_ingest_task
+    if await catalogue_ready():
+        return
+    if catalogue_ingest_task is None or catalogue_ingest_task.done():
+        catalogue_ingest_task = asyncio.create_task(run_catalogue_ingest(dict(CATALOGUE_DEFAULT_FILTERS)))
+
+def load_persisted_guide():
+    """Load the last persisted snapshot: mapped in snapshot mode, copied into guide_store otherwise"""
+    if GUIDE_SERVE_MODE == 'snapshot':
+        snapshot = snapshot_reader.current()
+        if snapshot is not None:
+            readiness["guide"] = True
+            readiness["snapshot_revision"] = snapshot.revision
+        return
+    if not GUIDE_SNAPSHOT_PATH.exists():
+        return
+    try:
+        snapshot = GuideSnapshot(GUIDE_SNAPSHOT_PATH)
+        guide_store.load(snapshot.schedules.values())
+        readiness["guide"] = True
+        readiness["snapshot_revision"] = snapshot.revision
+        logger.info(f"Warm start from guide snapshot revision {snapshot.revision}")
+    except (OSError, ValueError, struct.error) as e:
+        logger.error(f"Error loading persisted guide snapshot: {e}")
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "TV EPG API"}
 
+@api_router.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok", "uptime": round(time.time() - readiness["started_at"], 3)}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    """Readiness: the IPTV-org catalogue has been ingested and the guide is warm"""
+    schedules = guide_store.schedules
+    if GUIDE_SERVE_MODE == 'snapshot':
+        snapshot = snapshot_reader.current()
+        schedules = snapshot.schedules if snapshot is not None else {}
+        if snapshot is not None:
+            readiness["guide"] = True
+            readiness["snapshot_revision"] = snapshot.revision
+    ready = await catalogue_ready() and readiness["guide"]
+    body = {
+        "status": "ready" if ready else "starting",
+        "catalogue": readiness["catalogue"],
+        "guide": readiness["guide"],
+        "snapshot_revision": readiness["snapshot_revision"],
+        "channels": len(schedules),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
@@ -500,69 +2477,55 @@ async def get_status_checks():
     status_checks = await db.status_checks.find().to_list(1000)
     return [StatusCheck(**status_check) for status_check in status_checks]
 
-@api_router.get("/channels", response_model=List[Channel])
-async def get_channels(category: Optional[str] = None):
-    """Get all channels with their current programming from EPG.PW, optionally filtered by category"""
+def filter_channels_by_category(all_channels: List[Channel], category: Optional[str]) -> List[Channel]:
+    """Filter channels by sidebar category ('All' or unknown categories return everything)"""
+    if category and category.lower() != 'all':
+        if category.lower() == 'sports':
+            return [ch for ch in all_channels if ch.category == 'Sports']
+        elif category.lower() == 'kids':
+            return [ch for ch in all_channels if ch.category == 'Kids']
+        elif category.lower() == 'movies':
+            return [ch for ch in all_channels if ch.category == 'Movies']
+        elif category.lower() == 'tv shows':
+            return [ch for ch in all_channels if ch.category == 'TV Shows']
+        elif category.lower() == 'news':
+            return [ch for ch in all_channels if ch.category == 'News']
+        elif category.lower() == 'documentary':
+            return [ch for ch in all_channels if ch.category == 'Documentary']
+        elif category.lower() == 'lifestyle':
+            return [ch for ch in all_channels if ch.category == 'Lifestyle']
+    return all_channels  # Show all channels for 'All', no category or unknown categories
+
+def synthetic_channels(category: Optional[str], zone: ZoneRenderer = UTC_RENDERER) -> List[Channel]:
+    """Channels with realistic sample data, used when real data can't be served"""
+    channels = filter_channels_by_category(generate_channels_data(), category)
+    for channel in channels:
+        channel.programs = generate_realistic_programs(channel.id, channel.name).to_models(zone=zone)
+    return channels
+
+async def build_channels(category: Optional[str], zone: ZoneRenderer = UTC_RENDERER) -> List[Channel]:
+    """Get channels with their current programming from EPG.PW, optionally filtered by category"""
     try:
-        # Get today's date for EPG data
-        today = datetime.now().strftime("%Y%m%d")
-        
-        # Get base channel data with EPG channel IDs
-        all_channels = generate_channels_data()
-        
-        # Filter channels by category if specified
-        if category and category.lower() != 'all':
-            if category.lower() == 'sports':
-                channels = [ch for ch in all_channels if ch.category == 'Sports']
-            elif category.lower() == 'kids':
-                channels = [ch for ch in all_channels if ch.category == 'Kids']
-            elif category.lower() == 'movies':
-                channels = [ch for ch in all_channels if ch.category == 'Movies']
-            elif category.lower() == 'tv shows':
-                channels = [ch for ch in all_channels if ch.category == 'TV Shows']
-            elif category.lower() == 'news':
-                channels = [ch for ch in all_channels if ch.category == 'News']
-            elif category.lower() == 'documentary':
-                channels = [ch for ch in all_channels if ch.category == 'Documentary']
-            elif category.lower() == 'lifestyle':
-                channels = [ch for ch in all_channels if ch.category == 'Lifestyle']
-            else:
-                channels = all_channels  # Default to all if unknown category
-        else:
-            channels = all_channels  # Show all channels for 'All' or no category
+        # Get base channel data with EPG channel IDs, filtered by category if specified
+        with profile_stage("filter"):
+            channels = filter_channels_by_category(generate_channels_data(), category)
         
-        # Fetch real EPG data for each channel
-        for channel in channels:
-            if channel.epg_channel_id:
-                logger.info(f"Fetching EPG data for {channel.name} (ID: {channel.epg_channel_id})")
-                
-                # Get EPG data from epg.pw (XML format)
-                xml_data = await epg_pw_service.get_epg_data(channel.epg_channel_id, today)
-                
-                if xml_data:
-                    # Convert EPG XML data to programs
-                    programs = await epg_pw_service.convert_epg_to_programs(xml_data, channel.id)
-                    
-                    if programs:
-                        # Sort programs by start time and limit to next 8 hours
-                        now = datetime.now(pytz.timezone('America/New_York'))
-                        future_programs = [p for p in programs if p.end_time > now]
-                        sorted_programs = sorted(future_programs, key=lambda p: p.start_time)
-                        channel.programs = sorted_programs[:12]  # Next 12 programs (about 8-12 hours)
-                        
-                        logger.info(f"Loaded {len(channel.programs)} real programs for {channel.name}")
-                    else:
-                        # Fallback to realistic sample data
-                        channel.programs = generate_realistic_programs(channel.id, channel.name)
-                        logger.info(f"Using fallback data for {channel.name}")
-                else:
-                    # Fallback to realistic sample data
-                    channel.programs = generate_realistic_programs(channel.id, channel.name)
-                    logger.info(f"No EPG data found, using fallback for {channel.name}")
+        # Load programming for each channel, from the shared snapshot when serving multi-worker
+        now_ts = time.time()
+        with profile_stage("load"):
+            if GUIDE_SERVE_MODE == 'snapshot':
+                snapshot = snapshot_reader.current()
+                schedules = {channel.id: snapshot.get(channel.id) for channel in channels} if snapshot else {}
             else:
-                # No EPG channel ID, use sample data
-                channel.programs = generate_realistic_programs(channel.id, channel.name)
-                logger.info(f"No EPG channel ID for {channel.name}, using sample data")
+                schedules = await guide_loader.ensure_window(channels, now_ts, now_ts + GUIDE_WINDOW_HOURS * 3600)
+        with profile_stage("materialize"):
+            for channel in channels:
+                schedule = schedules.get(channel.id)
+                if schedule is None:
+                    # Never hit upstream from a worker; the ingest process owns that traffic
+                    schedule = generate_realistic_programs(channel.id, channel.name)
+                # Programs that haven't ended yet, in start order
+                channel.programs = schedule.to_models(schedule.upcoming(now_ts, limit=12), zone)  # Next 12 programs (about 8-12 hours)
         
         logger.info(f"Returning {len(channels)} channels for category: {category or 'All'}")
         return channels
@@ -570,26 +2533,212 @@ async def get_channels(category: Optional[str] = None):
     except Exception as e:
         logger.error(f"Error getting channels with EPG data: {e}")
         # Return channels with realistic sample data as fallback
-        all_channels = generate_channels_data()
-        
-        # Apply same category filtering for fallback
-        if category and category.lower() != 'all':
-            if category.lower() == 'sports':
-                channels = [ch for ch in all_channels if ch.category == 'Sports']
-            elif category.lower() == 'kids':
-                channels = [ch for ch in all_channels if ch.category == 'Kids']
-            elif category.lower() == 'movies':
-                channels = [ch for ch in all_channels if ch.category == 'Movies']
-            elif category.lower() == 'tv shows':
-                channels = [ch for ch in all_channels if ch.category == 'TV Shows']
-            else:
-                channels = all_channels
-        else:
-            channels = all_channels
-            
-        for channel in channels:
-            channel.programs = generate_realistic_programs(channel.id, channel.name)
-        return channels
+        return synthetic_channels(category, zone)
+
+# Request coalescing and admission control
+CHANNELS_MAX_CONCURRENCY = int(os.environ.get('CHANNELS_MAX_CONCURRENCY', '4'))
+CHANNELS_MAX_QUEUE = int(os.environ.get('CHANNELS_MAX_QUEUE', '32'))
+CHANNEL_LIST_ADAPTER = TypeAdapter(List[Channel])
+
+class CoalescingGate:
+    """Shares one in-flight computation between identical requests and sheds load when saturated.
+    
+    At most max_concurrency computations run at once and max_queue more may wait;
+    beyond that requests are served a degraded response instead of queueing.
+    """
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_pending = max_concurrency + max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending = 0
+        self.last_good: Dict[str, Any] = {}
+        self.stats = {"requests": 0, "computed": 0, "coalesced": 0, "shed": 0, "served_stale": 0, "served_synthetic": 0}
+    
+    async def _execute(self, key: str, compute):
+        try:
+            async with self._semaphore:
+                result = await compute()
+        finally:
+            self._pending -= 1
+        self.stats["computed"] += 1
+        self.last_good[key] = result
+        return result
+    
+    async def run(self, key: str, compute, fallback):
+        """Return compute()'s result, shared with identical in-flight requests, or fallback(key) when shed"""
+        self.stats["requests"] += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+        if self._pending >= self.max_pending:
+            self.stats["shed"] += 1
+            if key in self.last_good:
+                self.stats["served_stale"] += 1
+                return self.last_good[key]
+            self.stats["served_synthetic"] += 1
+            return fallback(key)
+        self._pending += 1
+        task = asyncio.ensure_future(self._execute(key, compute))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one client disconnecting doesn't cancel the work others are waiting on
+        return await asyncio.shield(task)
+    
+    def snapshot_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "in_flight": len(self._inflight), "pending": self._pending, "max_pending": self.max_pending}
+
+channels_gate = CoalescingGate(CHANNELS_MAX_CONCURRENCY, CHANNELS_MAX_QUEUE)
+
+@api_router.get("/channels", response_model=List[Channel])
+async def get_channels(category: Optional[str] = None, tz: Optional[str] = None,
+                       x_timezone: Optional[str] = Header(None)):
+    """Get all channels with their current programming from EPG.PW, optionally filtered by category"""
+    zone = viewer_zone(tz, x_timezone)
+    key = f"{(category or 'all').lower()}|{zone.name}"
+    
+    async def compute():
+        # Serialize once; coalesced requests share the encoded body
+        channels = await build_channels(category, zone)
+        with profile_stage("serialize"):
+            return CHANNEL_LIST_ADAPTER.dump_json(channels)
+    
+    body = await channels_gate.run(key, compute, lambda _: CHANNEL_LIST_ADAPTER.dump_json(synthetic_channels(category, zone)))
+    return Response(content=body, media_type="application/json")
+
+@api_router.get("/channels/stats")
+async def get_channels_stats():
+    """Coalescing and admission control counters for /api/channels"""
+    return channels_gate.snapshot_stats()
+
+@api_router.get("/sources/stats")
+async def get_source_stats():
+    """Per-source latency and coverage of the merged guide"""
+    return {
+        "sources": [
+            {"name": source.name, "priority": source.priority, **source.stats.to_dict()}
+            for source in sorted(epg_sources, key=lambda source: -source.priority)
+        ]
+    }
+
+@api_router.get("/admin/profiles")
+async def get_request_profiles(x_admin_token: Optional[str] = Header(None), limit: int = 20,
+                               format: str = "json", metric: str = "wall"):
+    """Get the last N request profiles as JSON or collapsed stacks for flamegraph tools (admin only)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not _admin_token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    profiles = list(profile_history)[-max(1, limit):]
+    if format == "folded":
+        lines = [line for profile in profiles for line in profile.folded(metric)]
+        return Response(content="\n".join(lines) + "\n", media_type="text/plain")
+    return {"profiles": [profile.to_dict() for profile in reversed(profiles)]}
+
+# Viewport-paged grid
+GRID_SLOT_MINUTES = 30  # matches getTimeHeaders() in App.js
+GRID_DEFAULT_SLOTS = 16
+GRID_MAX_SLOTS = 48
+GRID_MAX_ROWS = 50
+GRID_MAX_START_OFFSET = 366 * 86400  # seconds either side of now
+
+def _align_local(ts: float, unit: int, zone: ZoneRenderer) -> float:
+    """Round ts down to a multiple of unit seconds in the viewer's local time"""
+    offset = zone.offset(ts).utcoffset(None).total_seconds()
+    local = ts + offset
+    return local - local % unit - offset
+
+def parse_grid_start(start: Optional[str], zone: ZoneRenderer = UTC_RENDERER) -> float:
+    """Window start as epoch seconds: an ISO datetime or epoch value, by default 3 hours ago.
+    
+    Naive datetimes are read in the viewer's zone; the result is aligned down to a slot
+    boundary in that zone, like the grid's time headers.
+    """
+    if start is None:
+        # Round down to the local hour, like getTimeHeaders() in App.js
+        return _align_local(time.time() - 3 * 3600, 3600, zone)
+    try:
+        ts = float(start)
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(start.replace('Z', '+00:00'))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="start must be an ISO datetime or epoch seconds")
+        if parsed.tzinfo is None:
+            parsed = zone.zone.localize(parsed)
+        ts = parsed.timestamp()
+    if not math.isfinite(ts) or abs(ts - time.time()) > GRID_MAX_START_OFFSET:
+        raise HTTPException(status_code=422, detail="start must be within a year of now")
+    return _align_local(ts, GRID_SLOT_MINUTES * 60, zone)
+
+def grid_cells(schedule: ChannelSchedule, window_start: float, window_end: float,
+               zone: ZoneRenderer = UTC_RENDERER) -> List[GridCell]:
+    slot = GRID_SLOT_MINUTES * 60
+    cells = []
+    rows = schedule.window(window_start, window_end)
+    for row, program in zip(rows, schedule.to_models(rows, zone)):
+        visible_start, visible_end = max(row.start, window_start), min(row.end, window_end)
+        cells.append(GridCell(
+            **program.dict(),
+            col_start=round((visible_start - window_start) / slot, 4),
+            col_span=round((visible_end - visible_start) / slot, 4),
+            clipped_start=row.start < window_start,
+            clipped_end=row.end > window_end
+        ))
+    return cells
+
+@api_router.get("/grid", response_model=GridPage)
+async def get_grid(category: Optional[str] = None, row_start: int = 0, row_count: int = 10,
+                   start: Optional[str] = None, slots: int = GRID_DEFAULT_SLOTS, tz: Optional[str] = None,
+                   x_timezone: Optional[str] = Header(None)):
+    """Get only the visible cells of the guide grid: a channel row range and a window of 30-minute slots"""
+    zone = viewer_zone(tz, x_timezone)
+    row_start = max(row_start, 0)
+    row_count = min(max(row_count, 1), GRID_MAX_ROWS)
+    slots = min(max(slots, 1), GRID_MAX_SLOTS)
+    window_start = parse_grid_start(start, zone)
+    window_end = window_start + slots * GRID_SLOT_MINUTES * 60
+    
+    all_channels = filter_channels_by_category(generate_channels_data(), category)
+    visible = all_channels[row_start:row_start + row_count]
+    if GUIDE_SERVE_MODE == 'snapshot':
+        snapshot = snapshot_reader.current()
+        schedules = {channel.id: snapshot.get(channel.id) for channel in visible} if snapshot else {}
+    else:
+        schedules = await guide_loader.ensure_window(visible, window_start, window_end)
+    
+    rows = []
+    for offset, channel in enumerate(visible):
+        schedule = schedules.get(channel.id) or generate_realistic_programs(channel.id, channel.name)
+        rows.append(GridRow(
+            row=row_start + offset,
+            cells=grid_cells(schedule, window_start, window_end, zone),
+            **channel.dict(include={"id", "number", "name", "logo", "logo_url", "logo_proxy_url", "category"})
+        ))
+    
+    # Query parameters for the adjacent pages, so clients can prefetch while scrolling
+    page = {"category": category, "row_start": row_start, "row_count": row_count, "slots": slots, "start": int(window_start), "tz": tz}
+    horizon_start, horizon_end = horizon_bounds()
+    window_seconds = window_end - window_start
+    prefetch = {
+        "rows_previous": {**page, "row_start": max(0, row_start - row_count)} if row_start > 0 else None,
+        "rows_next": {**page, "row_start": row_start + row_count} if row_start + row_count < len(all_channels) else None,
+        "time_previous": {**page, "start": int(window_start - window_seconds)} if window_start > horizon_start else None,
+        "time_next": {**page, "start": int(window_end)} if window_end < horizon_end else None,
+    }
+    return GridPage(
+        window=GridWindow(
+            start=zone.render(window_start),
+            end=zone.render(window_end),
+            slot_minutes=GRID_SLOT_MINUTES,
+            slots=slots
+        ),
+        row_start=row_start,
+        row_count=len(rows),
+        total_rows=len(all_channels),
+        rows=rows,
+        prefetch=prefetch
+    )
 
 @api_router.post("/channels/{channel_id}/favorite")
 async def toggle_channel_favorite(channel_id: int):
@@ -610,6 +2759,9 @@ async def mark_channel_recent(channel_id: int):
     """Mark a channel as recently viewed"""
     try:
         add_to_recent(channel_id)
+        # Unknown ids would compete with real channels for the top-k slots
+        if any(channel.id == channel_id for channel in generate_channels_data()):
+            channel_popularity.record(channel_id)
         return {
             "channel_id": channel_id,
             "message": "Channel added to recent list"
@@ -618,6 +2770,128 @@ async def mark_channel_recent(channel_id: int):
         logger.error(f"Error adding channel {channel_id} to recent: {e}")
         raise HTTPException(status_code=500, detail="Error updating recent channels")
 
+@api_router.get("/events")
+async def server_events():
+    """Server-sent events stream (programme reminders)"""
+    require_reminders()
+    queue = event_broker.subscribe()
+    
+    async def stream():
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        finally:
+            event_broker.unsubscribe(queue)
+    
+    # X-Accel-Buffering stops nginx (see nginx.conf) from holding events in its proxy buffer
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@api_router.post("/reminders", response_model=Reminder)
+async def set_reminder(input: ReminderCreate, tz: Optional[str] = None, x_timezone: Optional[str] = Header(None)):
+    """Set a reminder that fires lead_minutes before a programme starts"""
+    require_reminders()
+    zone = viewer_zone(tz, x_timezone)
+    channel = next((ch for ch in generate_channels_data() if ch.id == input.channel_id), None)
+    row = find_program(channel, input.program_id) if channel else None
+    if row is None:
+        raise HTTPException(status_code=404, detail="Programme not found")
+    if row.start <= time.time():
+        raise HTTPException(status_code=400, detail="Programme has already started")
+    fire_at = row.start - input.lead_minutes * 60
+    doc = {
+        "channel_id": input.channel_id,
+        "title": row.text("title"),
+        "start": row.start,
+        "fire_at": fire_at,
+        "lead_minutes": input.lead_minutes,
+        "fired": False,
+        "created_at": datetime.utcnow(),
+    }
+    await db.reminders.replace_one({"_id": input.program_id}, doc, upsert=True)
+    reminder_scheduler.schedule(input.program_id, fire_at)
+    return Reminder(
+        program_id=input.program_id,
+        channel_id=input.channel_id,
+        title=doc["title"],
+        start_time=zone.render(row.start),
+        fire_at=zone.render(fire_at),
+        lead_minutes=input.lead_minutes
+    )
+
+@api_router.delete("/reminders/{program_id}")
+async def cancel_reminder(program_id: str):
+    """Cancel a programme reminder"""
+    require_reminders()
+    result = await db.reminders.delete_one({"_id": program_id, "fired": False})
+    reminder_scheduler.cancel(program_id)
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Reminder not found")
+    return {"program_id": program_id, "message": "Reminder cancelled"}
+
+@api_router.get("/reminders")
+async def get_reminders(limit: int = 100, tz: Optional[str] = None, x_timezone: Optional[str] = Header(None)):
+    """Get pending reminders, soonest first"""
+    require_reminders()
+    zone = viewer_zone(tz, x_timezone)
+    cursor = db.reminders.find({"fired": False}).sort("fire_at", 1).limit(min(max(limit, 1), 1000))
+    reminders = []
+    async for doc in cursor:
+        reminders.append({
+            "program_id": doc["_id"],
+            "channel_id": doc["channel_id"],
+            "title": doc["title"],
+            "start_time": zone.render(doc["start"]),
+            "fire_at": zone.render(doc["fire_at"]),
+            "lead_minutes": doc["lead_minutes"],
+        })
+    return {"reminders": reminders, "count": len(reminders), "scheduled": len(reminder_scheduler)}
+
+@api_router.get("/trending")
+async def get_trending(limit: int = 10, category: Optional[str] = None, tz: Optional[str] = None,
+                       x_timezone: Optional[str] = Header(None)):
+    """Most viewed channels (time-decayed) with what is airing on them now"""
+    zone = viewer_zone(tz, x_timezone)
+    now_ts = time.time()
+    channels = {channel.id: channel for channel in filter_channels_by_category(generate_channels_data(), category)}
+    leaders = [
+        (channels[int(key)], score)
+        for key, score in channel_popularity.top(now=now_ts)
+        if key.isdigit() and int(key) in channels
+    ][:min(max(limit, 1), TRENDING_TOP_K)]
+    
+    visible = [channel for channel, _ in leaders]
+    if GUIDE_SERVE_MODE == 'snapshot':
+        snapshot = snapshot_reader.current()
+        schedules = {channel.id: snapshot.get(channel.id) for channel in visible} if snapshot else {}
+    else:
+        schedules = await guide_loader.ensure_window(visible, now_ts, now_ts + 1)
+    
+    trending = []
+    for rank, (channel, score) in enumerate(leaders, start=1):
+        schedule = schedules.get(channel.id) or generate_realistic_programs(channel.id, channel.name)
+        rows = schedule.upcoming(now_ts, limit=2)
+        if rows and rows[0].start > now_ts:
+            rows = [None] + rows[:1]  # Nothing airing right now
+        programs = [row.to_model(zone) if row is not None else None for row in rows] + [None, None]
+        trending.append(TrendingChannel(
+            rank=rank,
+            score=round(score, 3),
+            channel=channel,
+            now_playing=programs[0],
+            up_next=programs[1]
+        ))
+    return {
+        "channels": trending,
+        "half_life_seconds": channel_popularity.half_life,
+        "events": channel_popularity.events,
+    }
+
 @api_router.get("/favorites")
 async def get_user_favorites():
     """Get list of user's favorite channel IDs"""
@@ -626,10 +2900,120 @@ async def get_user_favorites():
         "count": len(user_favorites)
     }
 
-def generate_realistic_programs(channel_id: int, channel_name: str) -> List[ChannelProgram]:
+@api_router.post("/catalogue/ingest")
+async def ingest_catalogue(request: Optional[CatalogueIngestRequest] = None):
+    """Start a streaming IPTV-org catalogue ingest into the persistent channel index"""
+    global catalogue_ingest_task
+    if catalogue_ingest_task is not None and not catalogue_ingest_task.done():
+        return {"status": "running"}
+    filters = dict(CATALOGUE_DEFAULT_FILTERS)
+    if request is not None:
+        filters.update({key: value for key, value in request.dict().items() if value is not None})
+    catalogue_ingest_task = asyncio.create_task(run_catalogue_ingest(filters))
+    return {"status": "started", "filters": filters}
+
+async def run_catalogue_ingest(filters: Dict[str, Any]):
+    """Run an ingest, recording a failure in catalogue_meta instead of losing it with the task"""
+    try:
+        await epg_service.ingest_catalogue(**filters)
+        readiness["catalogue"] = True
+    except Exception as e:
+        logger.error(f"IPTV-org catalogue ingest failed: {e}")
+        try:
+            await db.catalogue_meta.update_one(
+                {'_id': 'iptv'},
+                {'$set': {'last_error': str(e) or type(e).__name__, 'failed_at': datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as db_error:
+            logger.error(f"Error recording catalogue ingest failure: {db_error}")
+
+@api_router.get("/catalogue")
+async def get_catalogue_status():
+    """Get metadata about the last catalogue ingest"""
+    meta = await db.catalogue_meta.find_one({'_id': 'iptv'}) or {}
+    meta.pop('_id', None)
+    running = catalogue_ingest_task is not None and not catalogue_ingest_task.done()
+    return {"running": running, **meta}
+
+@api_router.get("/catalogue/search")
+async def search_catalogue(q: Optional[str] = None, country: Optional[str] = None, category: Optional[str] = None, limit: int = 50):
+    """Search the persisted IPTV-org channel index by name prefix, country and category"""
+    query: Dict[str, Any] = {}
+    if q:
+        query['search_names'] = {'$regex': f"^{re.escape(q.lower())}"}
+    if country:
+        query['country'] = country.upper()
+    if category:
+        query['categories'] = category.lower()
+    cursor = db.iptv_channels.find(query).limit(min(max(limit, 1), 500))
+    results = []
+    async for doc in cursor:
+        doc['id'] = doc.pop('_id')
+        doc.pop('search_names', None)
+        results.append(doc)
+    return {"results": results, "count": len(results)}
+
+@api_router.get("/export/xmltv")
+async def export_xmltv(category: Optional[str] = None, gzip: bool = False):
+    """Stream the stored guide as XMLTV, optionally gzip-compressed"""
+    lineup = generate_channels_data()
+    channels = filter_channels_by_category(lineup, category)
+    revision, schedules = current_guide()
+    kind = export_kind("xmltv", channels, lineup)
+    return export_response(kind, "guide.xml", "application/xml", revision,
+                           lambda: iter_xmltv(channels, schedules), gzip)
+
+@api_router.get("/export/m3u")
+async def export_m3u(request: Request, category: Optional[str] = None, gzip: bool = False):
+    """Stream the channel lineup as an M3U playlist pointing at the XMLTV export"""
+    lineup = generate_channels_data()
+    channels = filter_channels_by_category(lineup, category)
+    kind = export_kind("m3u", channels, lineup)
+    # The XMLTV URL follows the request's host, so it is part of the cached artifact's identity
+    xmltv_url = str(request.url_for("export_xmltv"))
+    signature = "|".join(f"{ch.id}:{ch.number}:{ch.name}:{ch.logo_url}:{ch.category}" for ch in channels)
+    revision = hashlib.sha1(f"{signature}|{M3U_STREAM_URL_TEMPLATE}|{xmltv_url}".encode('utf-8')).hexdigest()[:12]
+    return export_response(kind, "lineup.m3u", "audio/x-mpegurl", revision,
+                           lambda: iter_m3u(channels, xmltv_url), gzip)
+
+@api_router.get("/logos/sprite")
+async def get_logo_sprite(category: Optional[str] = None, width: int = LOGO_DEFAULT_WIDTH, height: int = LOGO_DEFAULT_HEIGHT):
+    """Get a single atlas image of the lineup's logos with the cell of each channel"""
+    width, height = logo_size(width, height)
+    channels = filter_channels_by_category(generate_channels_data(), category)
+    sprite = await logo_service.get_sprite(channels, width, height)
+    if sprite is None:
+        raise HTTPException(status_code=503, detail="Logo sprite unavailable")
+    return sprite
+
+@api_router.get("/logos/sprite/{sprite_name}")
+async def get_logo_sprite_image(sprite_name: str):
+    """Serve a previously built logo atlas"""
+    path = LOGO_CACHE_DIR / sprite_name
+    if not re.fullmatch(r"sprite_[0-9a-f]{12}_\d+x\d+\.png", sprite_name) or not path.exists():
+        raise HTTPException(status_code=404, detail="Sprite not found")
+    return FileResponse(path, media_type="image/png", headers={"Cache-Control": LOGO_CACHE_CONTROL})
+
+@api_router.get("/logos/{channel_id}")
+async def get_channel_logo(channel_id: int, v: Optional[str] = None, width: int = LOGO_DEFAULT_WIDTH, height: int = LOGO_DEFAULT_HEIGHT):
+    """Get a channel logo resized for the grid, served from the local disk cache"""
+    channel = next((ch for ch in generate_channels_data() if ch.id == channel_id), None)
+    if channel is None or not channel.logo_url:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    width, height = logo_size(width, height)
+    path = await logo_service.get_logo(channel.logo_url, width, height)
+    if path is None:
+        raise HTTPException(status_code=502, detail="Logo unavailable")
+    # Only versioned URLs are safe to cache forever; the version changes with the upstream logo
+    cache_control = LOGO_CACHE_CONTROL if v == logo_version(channel.logo_url) else "public, max-age=3600"
+    media_type = LOGO_MEDIA_TYPES.get(path.suffix[1:], "application/octet-stream")
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": cache_control})
+
+def generate_realistic_programs(channel_id: int, channel_name: str) -> ChannelSchedule:
     """Generate realistic programs based on channel type"""
-    programs = []
-    base_time = datetime.now().replace(minute=0, second=0, microsecond=0)
+    programs = guide_store.new_schedule(channel_id)
+    base_time = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
     
     # Channel-specific programming
     channel_programming = {
@@ -705,25 +3089,26 @@ def generate_realistic_programs(channel_id: int, channel_name: str) -> List[Chan
         
         description = descriptions.get(genre, f"Watch {title} on {channel_name}.")
         
-        program = ChannelProgram(
+        programs.append(
+            int(start_time.timestamp()),
+            int(end_time.timestamp()),
             id=f"realistic_{channel_id}_{i}",
             title=title,
             episode=f"Season {2024 - channel_id} Episode {i + 1}" if genre in ["Drama", "Comedy"] else None,
-            start_time=start_time,
-            end_time=end_time,
             description=description,
             image=None,  # No fake images
             rating="TV-14" if genre in ["Drama", "News"] else "TV-PG",
-            channel_id=channel_id,
             genre=genre
         )
-        programs.append(program)
     
     return programs
 
 # Include the router in the main app
 app.include_router(api_router)
 
+if ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -742,9 +3127,38 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     logger.info("TV EPG API starting up...")
+    load_persisted_guide()
+    if GUIDE_SERVE_MODE != 'snapshot':
+        # Don't block startup on upstream fetches; readiness flips once the guide is warm
+        app.state.warm_task = asyncio.create_task(warm_guide())
+        app.state.catalogue_task = asyncio.create_task(warm_catalogue())
+        reminder_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if GUIDE_SERVE_MODE != 'snapshot' and readiness["guide"]:
+        try:
+            write_guide_snapshot(guide_store)
+        except OSError as e:
+            logger.error(f"Error persisting guide snapshot: {e}")
+    await reminder_scheduler.stop()
     await epg_pw_service.close_session()
+    await epg_service.close_session()
+    for source in epg_sources:
+        await source.close_session()
+    await logo_service.close_session()
     client.close()
-    logger.info("TV EPG API shutting down...")
\ No newline at end of file
+    logger.info("TV EPG API shutting down...")
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="TV EPG backend utilities")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subcommands.add_parser("ingest", help="Refresh the guide and publish shared snapshots")
+    ingest_parser.add_argument("--interval", type=float, default=float(os.environ.get('GUIDE_INGEST_INTERVAL', '900')),
+                               help="Seconds between guide refreshes")
+    args = parser.parse_args()
+    
+    if args.command == "ingest":
+        asyncio.run(run_guide_ingest(args.interval))
@@ -5,24 +5,40 @@ set -e
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
 echo "Starting FastAPI backend"
+WORKERS=${WEB_CONCURRENCY:-1}
+INGEST_PID=""
+if [ "$WORKERS" -gt 1 ]; then
+    # Multi-worker mode: one ingest process publishes the guide snapshot,
+    # every uvicorn worker memory-maps it instead of fetching upstream itself
+    export GUIDE_SERVE_MODE=snapshot
+    python3 server.py ingest &
+    INGEST_PID=$!
+fi
+
 # Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+uvicorn server:app --host 0.0.0.0 --port 8001 --workers "$WORKERS" &
 BACKEND_PID=$!
 
 echo "Waiting for backend to start..."
-sleep 30
-
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
-fi
+# Poll the liveness endpoint instead of sleeping a fixed 30s; the backend warm-starts
+# from its persisted guide snapshot, /api/health/ready reports when the guide is warm
+for i in $(seq 1 30); do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if wget -q -O /dev/null http://127.0.0.1:8001/api/health/live 2>/dev/null; then
+        break
+    fi
+    sleep 1
+done
 
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
 # Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+trap 'kill $BACKEND_PID $NGINX_PID $INGEST_PID; exit 0' SIGTERM SIGINT
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
@@ -32,10 +48,10 @@ done
 # If we get here, one of the processes died
 if kill -0 $BACKEND_PID 2>/dev/null; then
     echo "Nginx died, shutting down backend..."
-    kill $BACKEND_PID
+    kill $BACKEND_PID $INGEST_PID
 else
     echo "Backend died, shutting down nginx..."
-    kill $NGINX_PID
+    kill $NGINX_PID $INGEST_PID
 fi
 
 exit 1
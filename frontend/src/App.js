@@ -51,8 +51,10 @@ const App = () => {
       setError(null);
       
       const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
-      const categoryParam = category !== 'All' ? `?category=${encodeURIComponent(category)}` : '';
-      const response = await fetch(`${backendUrl}/api/channels${categoryParam}`);
+      // Ask for programme times in the viewer's own timezone
+      const params = new URLSearchParams({ tz: Intl.DateTimeFormat().resolvedOptions().timeZone });
+      if (category !== 'All') params.set('category', category);
+      const response = await fetch(`${backendUrl}/api/channels?${params}`);
       
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
@@ -401,6 +403,16 @@ const App = () => {
     return baseTime;
   };
 
+  // Prefer the backend logo proxy (resized, cached); fall back to the upstream image
+  const getLogoSrc = (channel) => {
+    if (!channel) return undefined;
+    if (channel.logo_proxy_url) {
+      const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8000';
+      return `${backendUrl}${channel.logo_proxy_url}`;
+    }
+    return channel.logo_url;
+  };
+
   const isCurrentlyAiring = (program) => {
     const now = new Date();
     return program.startTime <= now && program.endTime > now;
@@ -527,7 +539,7 @@ const App = () => {
               <div className="program-details">
                 <div className="channel-info-header">
                   <img 
-                    src={channels[gridFocus.channel]?.logo_url} 
+                    src={getLogoSrc(channels[gridFocus.channel])} 
                     alt={channels[gridFocus.channel]?.name}
                     className="channel-logo-large"
                     onError={(e) => {
@@ -586,7 +598,7 @@ const App = () => {
                   <span className="channel-number">{channel.number}</span>
                   <div className="channel-logo-container">
                     <img 
-                      src={channel.logo_url} 
+                      src={getLogoSrc(channel)} 
                       alt={channel.name}
                       className="channel-logo-image"
                       onError={(e) => {
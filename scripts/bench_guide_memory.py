@@ -0,0 +1,87 @@
+"""Compare guide memory usage: list of ChannelProgram models vs the columnar GuideStore.
+
+Usage:
+    python scripts/bench_guide_memory.py --channels 2000 --days 7
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from server import ChannelProgram, GuideStore  # noqa: E402
+
+TITLES = ["SportsCenter", "CNN Newsroom", "Law & Order", "Nature", "Family Guy", "Evening News"]
+GENRES = ["Sports", "News", "Drama", "Documentary", "Comedy", "News"]
+
+
+def synthetic_rows(channel_id, programmes):
+    base = datetime(2025, 1, 1)
+    for i in range(programmes):
+        start = base + timedelta(minutes=30 * i)
+        title = TITLES[i % len(TITLES)]
+        yield {
+            "id": f"bench_{channel_id}_{i}",
+            "title": title,
+            "episode": None,
+            "start_time": start,
+            "end_time": start + timedelta(minutes=30),
+            "description": f"Watch {title}, quality programming with engaging content.",
+            "image": None,
+            "rating": "TV-PG",
+            "genre": GENRES[i % len(GENRES)],
+        }
+
+
+def build_models(channels, programmes):
+    return {
+        channel_id: [ChannelProgram(channel_id=channel_id, **row) for row in synthetic_rows(channel_id, programmes)]
+        for channel_id in range(channels)
+    }
+
+
+def build_columnar(channels, programmes):
+    store = GuideStore()
+    for channel_id in range(channels):
+        schedule = store.new_schedule(channel_id)
+        for row in synthetic_rows(channel_id, programmes):
+            start, end = row.pop("start_time"), row.pop("end_time")
+            schedule.append(int(start.timestamp()), int(end.timestamp()), **row)
+        store.put(schedule)
+    return store
+
+
+def measure(builder, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = builder(*args)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--per-day", type=int, default=48, help="programmes per channel per day")
+    args = parser.parse_args()
+
+    programmes = args.days * args.per_day
+    rows = args.channels * programmes
+    models = measure(build_models, args.channels, programmes)
+    columnar = measure(build_columnar, args.channels, programmes)
+
+    print(f"{args.channels} channels x {programmes} programmes ({rows} rows)")
+    print(f"  list of ChannelProgram: {models / 2**20:8.1f} MiB ({models / rows:6.0f} B/row)")
+    print(f"  columnar GuideStore:    {columnar / 2**20:8.1f} MiB ({columnar / rows:6.0f} B/row)")
+    print(f"  ratio:                  {models / columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# server.py reads its configuration at import time; keep test runs away from backend/data
+_data_dir = Path(tempfile.mkdtemp(prefix="epg-tests-"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+os.environ["GUIDE_SNAPSHOT_PATH"] = str(_data_dir / "guide.snapshot")
+os.environ["EXPORT_CACHE_DIR"] = str(_data_dir / "exports")
+os.environ["LOGO_CACHE_DIR"] = str(_data_dir / "logos")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A fresh GuideStore installed as the server's guide_store"""
+    fresh = server.GuideStore()
+    monkeypatch.setattr(server, "guide_store", fresh)
+    return fresh
+
+
+@pytest.fixture
+def xmltv_document():
+    """Builds an EPG.PW-style XMLTV document from (start, end, title) epoch tuples"""
+    def stamp(ts):
+        return server.time.strftime("%Y%m%d%H%M%S +0000", server.time.gmtime(ts))
+    
+    def build(programmes):
+        rows = "".join(
+            f'<programme start="{stamp(start)}" stop="{stamp(end)}"><title>{title}</title></programme>'
+            for start, end, title in programmes
+        )
+        return f"<tv>{rows}</tv>"
+    return build
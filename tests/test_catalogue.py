@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+import server
+
+DOCUMENT = b'[1,23,456, "a,b", {"a": [1, 2]}, true, null, -7.5e3 ]'
+EXPECTED = [1, 23, 456, "a,b", {"a": [1, 2]}, True, None, -7500.0]
+
+
+def decode(data, chunk_size):
+    async def chunks():
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+    
+    async def collect():
+        return [item async for item in server.iter_json_array(chunks())]
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, len(DOCUMENT)])
+def test_iter_json_array_across_chunk_boundaries(chunk_size):
+    assert decode(DOCUMENT, chunk_size) == EXPECTED
+
+
+def test_iter_json_array_rejects_missing_delimiter():
+    with pytest.raises(ValueError):
+        decode(b"[1 2]", 1)
+
+
+@pytest.mark.parametrize("data", [b'[1, 2, {"a": 1}', b"[1, 2,", b"[", b"", b"  \n"])
+def test_iter_json_array_rejects_truncated_stream(data):
+    with pytest.raises(ValueError):
+        decode(data, 3)
+
+
+def test_iter_json_array_empty_array():
+    assert decode(b" [ ] ", 1) == []
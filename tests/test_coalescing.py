@@ -0,0 +1,83 @@
+import asyncio
+
+import server
+
+
+class StubCompute:
+    """compute() factory that blocks until released and records concurrency"""
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, value):
+        async def compute():
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                await self.release.wait()
+                return value
+            finally:
+                self.running -= 1
+        return compute
+
+
+def synthetic(key):
+    return f"synthetic {key}"
+
+
+def test_identical_requests_share_one_computation():
+    async def run():
+        gate = server.CoalescingGate(max_concurrency=2, max_queue=2)
+        stub = StubCompute()
+        requests = [asyncio.ensure_future(gate.run("all|UTC", stub("body"), synthetic)) for _ in range(5)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        return gate, stub, await asyncio.gather(*requests)
+    gate, stub, results = asyncio.run(run())
+
+    assert results == ["body"] * 5
+    assert stub.calls == 1
+    assert gate.stats["computed"] == 1
+    assert gate.stats["coalesced"] == 4
+
+
+def test_concurrency_is_bounded():
+    async def run():
+        gate = server.CoalescingGate(max_concurrency=2, max_queue=4)
+        stub = StubCompute()
+        requests = [asyncio.ensure_future(gate.run(f"key{i}", stub(i), synthetic)) for i in range(5)]
+        for _ in range(3):
+            await asyncio.sleep(0)
+        stub.release.set()
+        return stub, await asyncio.gather(*requests)
+    stub, results = asyncio.run(run())
+
+    assert results == list(range(5))
+    assert stub.max_running == 2
+
+
+def test_saturated_gate_sheds_to_synthetic_then_last_good():
+    async def run():
+        gate = server.CoalescingGate(max_concurrency=1, max_queue=1)
+        warm = StubCompute()
+        warm.release.set()
+        assert await gate.run("news", warm("news body"), synthetic) == "news body"
+
+        stub = StubCompute()
+        busy = [asyncio.ensure_future(gate.run(key, stub(key), synthetic)) for key in ("a", "b")]
+        await asyncio.sleep(0)
+        shed = [await gate.run("sports", stub("sports"), synthetic), await gate.run("news", stub("news"), synthetic)]
+        stub.release.set()
+        await asyncio.gather(*busy)
+        return gate, stub, shed
+    gate, stub, shed = asyncio.run(run())
+
+    assert shed == ["synthetic sports", "news body"]
+    assert stub.calls == 2
+    assert gate.stats["shed"] == 2
+    assert gate.stats["served_synthetic"] == 1
+    assert gate.stats["served_stale"] == 1
+    assert gate.snapshot_stats()["pending"] == 0
@@ -0,0 +1,26 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, "EXPORT_CACHE_DIR", tmp_path)
+    return TestClient(server.app)
+
+
+def test_m3u_points_at_the_requesting_host(client):
+    first = client.get("/api/export/m3u", headers={"Host": "internal:8001"})
+    second = client.get("/api/export/m3u", headers={"Host": "tv.example.com"})
+    
+    assert first.text.startswith('#EXTM3U x-tvg-url="http://internal:8001/api/export/xmltv"')
+    assert second.text.startswith('#EXTM3U x-tvg-url="http://tv.example.com/api/export/xmltv"')
+
+
+def test_unknown_categories_share_the_full_lineup_artifact(client, tmp_path):
+    for category in ("zzz1", "zzz2", "All", None):
+        client.get("/api/export/m3u", params={"category": category} if category else {})
+    client.get("/api/export/m3u", params={"category": "Sports"})
+    
+    assert sorted(path.name.split("-")[0] for path in tmp_path.iterdir()) == ["m3u_all", "m3u_sports"]
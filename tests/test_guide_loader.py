@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+
+ESPN_ID = 6
+
+
+@pytest.fixture
+def loader(store, monkeypatch, xmltv_document):
+    """A GuideLoader backed only by a mocked epg.pw that has three hours around now"""
+    now = int(time.time())
+    base = now - now % 3600
+    programmes = [(base + i * 3600, base + (i + 1) * 3600, f"Real {i}") for i in range(-1, 2)]
+    
+    async def get_epg_data(channel_id, date=None):
+        return xmltv_document(programmes)
+    
+    monkeypatch.setattr(server.epg_pw_service, "get_epg_data", get_epg_data)
+    monkeypatch.setattr(server, "epg_sources", [server.EPGPWSource("epg.pw", 30)])
+    fresh = server.GuideLoader()
+    monkeypatch.setattr(server, "guide_loader", fresh)
+    return fresh
+
+
+def espn():
+    return next(channel for channel in server.generate_channels_data() if channel.id == ESPN_ID)
+
+
+def titles(schedule):
+    return [row.text("title") for row in schedule]
+
+
+def test_window_without_data_does_not_replace_stored_guide(loader, store):
+    now = time.time()
+    schedules = asyncio.run(loader.ensure_window([espn()], now, now + 3600))
+    assert titles(schedules[ESPN_ID]) == ["Real -1", "Real 0", "Real 1"]
+    
+    past = now - 30 * 86400
+    schedules = asyncio.run(loader.ensure_window([espn()], past, past + 3600))
+    assert not any(title.startswith("Real") for title in titles(schedules[ESPN_ID]))
+    assert titles(store.get(ESPN_ID)) == ["Real -1", "Real 0", "Real 1"]
+
+
+def test_grid_paged_past_the_data_keeps_channels_real(loader, store):
+    client = TestClient(server.app)
+    start = int(time.time()) - 200 * 86400
+    assert client.get("/api/grid", params={"category": "Sports", "start": start}).status_code == 200
+    
+    channels = client.get("/api/channels", params={"category": "Sports"}).json()
+    programs = next(channel for channel in channels if channel["id"] == ESPN_ID)["programs"]
+    assert programs and all(program["title"].startswith("Real") for program in programs)
+
+
+@pytest.mark.parametrize("start", ["nan", "inf", "-inf", "1e20", "9999-01-01T00:00:00"])
+def test_parse_grid_start_rejects_out_of_range(start):
+    with pytest.raises(HTTPException) as excinfo:
+        server.parse_grid_start(start)
+    assert excinfo.value.status_code == 422
+
+
+@pytest.mark.parametrize("zone_name, offset", [("Asia/Kolkata", 19800), ("Asia/Kathmandu", 20700)])
+def test_grid_start_aligns_to_local_time(zone_name, offset):
+    zone = server.zone_renderer(zone_name)
+    assert (server.parse_grid_start(None, zone) + offset) % 3600 == 0
+    assert (server.parse_grid_start(str(time.time()), zone) + offset) % 1800 == 0
+
+
+def test_ready_counts_snapshot_channels(monkeypatch, tmp_path):
+    source = server.GuideStore()
+    for channel_id in (1, 2):
+        schedule = source.new_schedule(channel_id)
+        schedule.append(100, 200, title="Show")
+        source.put(schedule)
+    path = tmp_path / "guide.snapshot"
+    server.write_guide_snapshot(source, path)
+    monkeypatch.setattr(server, "GUIDE_SERVE_MODE", "snapshot")
+    monkeypatch.setattr(server, "snapshot_reader", server.SnapshotReader(path))
+    monkeypatch.setitem(server.readiness, "catalogue", True)
+    monkeypatch.setitem(server.readiness, "guide", False)
+    monkeypatch.setitem(server.readiness, "snapshot_revision", None)
+    
+    body = TestClient(server.app).get("/api/health/ready").json()
+    
+    assert body["guide"] is True
+    assert body["channels"] == 2
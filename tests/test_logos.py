@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import server
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture
+def logos(monkeypatch, tmp_path):
+    """A LogoService caching into tmp_path whose upstream fetches are counted"""
+    monkeypatch.setattr(server, "LOGO_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(server, "_load_pil_image", lambda: None)
+    service = server.LogoService()
+    service.fetches = []
+    
+    async def fetch_original(url):
+        service.fetches.append(url)
+        return PNG + url.encode()
+    service.fetch_original = fetch_original
+    return service
+
+
+@pytest.mark.parametrize("requested, size", [
+    ((1, 1), (60, 30)),
+    ((60, 30), (60, 30)),
+    ((61, 30), (120, 60)),
+    ((100, 100), (240, 120)),
+    ((4000, 10), (240, 120)),
+])
+def test_logo_sizes_round_up(requested, size):
+    assert server.logo_size(*requested) == size
+
+
+def test_original_is_fetched_once_per_logo(logos, tmp_path):
+    async def run():
+        for width in range(8, 400, 40):
+            await logos.get_logo("https://example.com/a.png", *server.logo_size(width, 30))
+    asyncio.run(run())
+    
+    assert logos.fetches == ["https://example.com/a.png"]
+    assert len(list(tmp_path.iterdir())) == 1 + len(server.LOGO_SIZES)
+
+
+def test_cache_ignores_in_flight_temp_files(logos, tmp_path):
+    key = f"{server.logo_version('https://example.com/a.png')}_original"
+    (tmp_path / f"{key}.png.123.tmp").write_bytes(b"partial")
+    
+    path = asyncio.run(logos.get_original("https://example.com/a.png"))
+    
+    assert path.name == f"{key}.png"
+    assert logos.fetches == ["https://example.com/a.png"]
+
+
+def test_sprite_unknown_category_means_whole_lineup(monkeypatch):
+    lineups = []
+    
+    async def get_sprite(channels, width, height):
+        lineups.append([channel.id for channel in channels])
+        return {"cells": {}}
+    monkeypatch.setattr(server.logo_service, "get_sprite", get_sprite)
+    
+    asyncio.run(server.get_logo_sprite(category="zzz"))
+    asyncio.run(server.get_logo_sprite(category="all"))
+    
+    assert lineups[0] == lineups[1] == [channel.id for channel in server.generate_channels_data()]
@@ -0,0 +1,97 @@
+import server
+
+
+def schedule_of(rows):
+    """A ChannelSchedule from (start, end, title) tuples, in the given order"""
+    schedule = server.ChannelSchedule(7, server.StringPool())
+    for start, end, title in rows:
+        schedule.append(start, end, title=title)
+    return schedule
+
+
+def timeline(schedule):
+    return [(row.start, row.end, schedule.pool.decode(schedule.columns["title"][row.index])) for row in schedule]
+
+
+def test_same_start_keeps_highest_priority():
+    schedule = schedule_of([(0, 100, "Low"), (0, 100, "High"), (0, 100, "Mid")])
+    assert timeline(server.normalize_schedule(schedule, [1, 5, 3])) == [(0, 100, "High")]
+
+
+def test_same_start_equal_priority_keeps_first():
+    schedule = schedule_of([(0, 100, "First"), (0, 100, "Second")])
+    assert timeline(server.normalize_schedule(schedule)) == [(0, 100, "First")]
+
+
+def test_overlap_clips_lower_priority_programme():
+    earlier_wins = schedule_of([(0, 100, "A"), (50, 150, "B")])
+    assert timeline(server.normalize_schedule(earlier_wins, [5, 1])) == [(0, 100, "A"), (100, 150, "B")]
+
+    later_wins = schedule_of([(0, 100, "A"), (50, 150, "B")])
+    assert timeline(server.normalize_schedule(later_wins, [1, 5])) == [(0, 50, "A"), (50, 150, "B")]
+
+
+def test_overlap_tie_goes_to_later_programme():
+    schedule = schedule_of([(0, 100, "A"), (50, 150, "B")])
+    assert timeline(server.normalize_schedule(schedule)) == [(0, 50, "A"), (50, 150, "B")]
+
+
+def test_covered_lower_priority_programme_is_dropped():
+    schedule = schedule_of([(0, 300, "Movie"), (50, 100, "Short"), (300, 400, "Next")])
+    assert timeline(server.normalize_schedule(schedule, [5, 1, 1])) == [(0, 300, "Movie"), (300, 400, "Next")]
+
+
+def test_priorities_follow_rows_when_sorting():
+    schedule = schedule_of([(50, 150, "B"), (0, 100, "A")])
+    assert timeline(server.normalize_schedule(schedule, [1, 5])) == [(0, 100, "A"), (100, 150, "B")]
+
+
+def test_gaps_are_closed_or_filled():
+    small = server.SCHEDULE_GAP_TOLERANCE
+    schedule = schedule_of([(0, 100, "A"), (100 + small, 200, "B"), (1000, 1100, "C")])
+    result = server.normalize_schedule(schedule)
+    assert timeline(result) == [
+        (0, 100 + small, "A"),
+        (100 + small, 200, "B"),
+        (200, 1000, server.TBA_TITLE),
+        (1000, 1100, "C"),
+    ]
+    assert result.pool.decode(result.columns["id"][2]) == "tba_7_200"
+
+
+def test_nested_programme_resumes_the_one_it_interrupts():
+    schedule = schedule_of([(0, 10800, "Movie"), (600, 1200, "Promo")])
+    assert timeline(server.normalize_schedule(schedule)) == [
+        (0, 600, "Movie"),
+        (600, 1200, "Promo"),
+        (1200, 10800, "Movie"),
+    ]
+
+
+def test_resumed_remainder_keeps_its_priority():
+    schedule = schedule_of([(0, 100, "A"), (50, 400, "B"), (60, 120, "C")])
+    assert timeline(server.normalize_schedule(schedule, [5, 1, 3])) == [
+        (0, 100, "A"),
+        (100, 120, "C"),
+        (120, 400, "B"),
+    ]
+
+
+def test_resumed_remainder_yields_to_later_programmes():
+    schedule = schedule_of([(0, 10800, "Movie"), (600, 1200, "Promo"), (900, 2000, "News")])
+    assert timeline(server.normalize_schedule(schedule)) == [
+        (0, 600, "Movie"),
+        (600, 900, "Promo"),
+        (900, 2000, "News"),
+        (2000, 10800, "Movie"),
+    ]
+
+
+def test_every_interrupted_programme_resumes():
+    schedule = schedule_of([(44, 53, "A"), (45, 64, "B"), (50, 51, "C")])
+    assert timeline(server.normalize_schedule(schedule, [2, 1, 2])) == [
+        (44, 50, "A"),
+        (50, 51, "C"),
+        (51, 53, "A"),
+        (53, 64, "B"),
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import server
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def tracker():
+    tracker = server.PopularityTracker(half_life=3600, top_k=2)
+    tracker.landmark = NOW
+    return tracker
+
+
+def record(tracker, key, times, now=NOW):
+    for _ in range(times):
+        tracker.record(key, now=now)
+
+
+def test_scores_halve_every_half_life(tracker):
+    record(tracker, "news", 4)
+
+    assert tracker.score("news", now=NOW) == pytest.approx(4)
+    assert tracker.score("news", now=NOW + 3600) == pytest.approx(2)
+    assert tracker.score("news", now=NOW + 7200) == pytest.approx(1)
+    assert tracker.score("unseen", now=NOW) == 0
+
+
+def test_recent_views_outrank_older_ones(tracker):
+    record(tracker, "old", 4)
+    record(tracker, "new", 2, now=NOW + 7200)
+
+    assert tracker.top(now=NOW + 7200) == [("new", pytest.approx(2)), ("old", pytest.approx(1))]
+
+
+def test_top_k_evicts_the_minimum(tracker):
+    record(tracker, "a", 3)
+    record(tracker, "b", 2)
+    record(tracker, "c", 2)
+    # c only ties b's score, so it is not admitted yet
+    assert [key for key, _ in tracker.top(now=NOW)] == ["a", "b"]
+
+    record(tracker, "c", 1)
+    assert dict(tracker.top(now=NOW)) == {"a": pytest.approx(3), "c": pytest.approx(3)}
+    assert tracker.score("b", now=NOW) == pytest.approx(2)
+
+
+def test_renormalizing_keeps_scores(tracker):
+    record(tracker, "news", 2)
+    later = NOW + 41 * 3600  # forward weight passes 2 ** TRENDING_MAX_EXPONENT
+    record(tracker, "sports", 1, now=later)
+
+    assert tracker.landmark == later
+    assert tracker.score("news", now=later) == pytest.approx(2 * 2.0 ** -41)
+    assert tracker.top(now=later)[0] == ("sports", pytest.approx(1))
+
+
+
+def test_long_idle_tracker_does_not_overflow(tracker):
+    record(tracker, "news", 1)
+    years_later = NOW + 3 * 365 * 86400
+
+    assert tracker.score("news", now=years_later) == 0
+    record(tracker, "sports", 1, now=years_later)
+    assert tracker.top(now=years_later)[0] == ("sports", pytest.approx(1))
+
+
+def test_views_of_unknown_channels_are_not_counted(monkeypatch, tracker):
+    monkeypatch.setattr(server, "channel_popularity", tracker)
+    monkeypatch.setattr(server, "user_recent", [])
+
+    asyncio.run(server.mark_channel_recent(99999))
+    asyncio.run(server.mark_channel_recent(1))
+
+    assert [key for key, _ in tracker.top()] == ["1"]
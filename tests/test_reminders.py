@@ -0,0 +1,12 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.mark.parametrize("lead_minutes", [-5, 24 * 60 + 1])
+def test_reminder_lead_time_is_bounded(lead_minutes):
+    response = TestClient(server.app).post(
+        "/api/reminders", json={"program_id": "p1", "channel_id": 1, "lead_minutes": lead_minutes}
+    )
+    assert response.status_code == 422
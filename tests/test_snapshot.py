@@ -0,0 +1,95 @@
+import server
+
+
+def rows_of(schedule):
+    decode, columns = schedule.pool.decode, schedule.columns
+    return [
+        (row.start, row.end, {field: decode(columns[field][row.index]) for field in server.PROGRAM_TEXT_FIELDS})
+        for row in schedule
+    ]
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = server.GuideStore()
+    news = store.new_schedule(7)
+    news.append(1_700_000_000, 1_700_003_600, id="n1", title="Evening News", genre="News")
+    news.append(1_700_003_600, 1_700_007_200, id="n2", title="Café Société", description="Épisode 3")
+    store.put(news)
+    movies = store.new_schedule(3)
+    movies.append(1_700_000_000, 1_700_010_800, id="m1", title="Feature", rating="PG")
+    store.put(movies)
+    store.put(store.new_schedule(12))
+
+    path = tmp_path / "guide.snapshot"
+    revision = server.write_guide_snapshot(store, path)
+    snapshot = server.GuideSnapshot(path)
+
+    assert snapshot.revision == revision
+    assert sorted(snapshot.schedules) == [3, 7, 12]
+    for channel_id, schedule in store.schedules.items():
+        assert rows_of(snapshot.get(channel_id)) == rows_of(schedule)
+    assert len(snapshot.get(12)) == 0
+    assert snapshot.get(99) is None
+
+    window = snapshot.get(7).window(1_700_003_000, 1_700_004_000)
+    assert [row.start for row in window] == [1_700_000_000, 1_700_003_600]
+
+
+def test_empty_store_round_trip(tmp_path):
+    path = tmp_path / "guide.snapshot"
+    revision = server.write_guide_snapshot(server.GuideStore(), path)
+    snapshot = server.GuideSnapshot(path)
+
+    assert snapshot.revision == revision
+    assert snapshot.schedules == {}
+    assert len(snapshot.pool) == 0
+
+
+def test_snapshot_loads_back_into_store(tmp_path):
+    source = server.GuideStore()
+    schedule = source.new_schedule(5)
+    schedule.append(100, 200, title="Only")
+    source.put(schedule)
+    path = tmp_path / "guide.snapshot"
+    server.write_guide_snapshot(source, path)
+
+    store = server.GuideStore()
+    store.load(server.GuideSnapshot(path).schedules.values())
+
+    assert rows_of(store.get(5)) == rows_of(schedule)
+    assert store.digest() == source.digest()
+
+
+def test_digest_follows_content_not_encoding():
+    first, second = server.GuideStore(), server.GuideStore()
+    second.pool.encode("unrelated string")
+    for store in (first, second):
+        schedule = store.new_schedule(5)
+        schedule.append(100, 200, title="Only", genre=None)
+        store.put(schedule)
+    assert first.digest() == second.digest()
+
+    schedule = second.new_schedule(5)
+    schedule.append(100, 200, title="Changed")
+    second.put(schedule)
+    assert first.digest() != second.digest()
+
+
+def test_snapshot_loads_into_a_store_with_other_strings(tmp_path):
+    source = server.GuideStore()
+    schedule = source.new_schedule(5)
+    schedule.append(100, 200, title="Only", genre="News")
+    schedule.append(200, 300, title="Second")
+    source.put(schedule)
+    path = tmp_path / "guide.snapshot"
+    server.write_guide_snapshot(source, path)
+
+    store = server.GuideStore()
+    existing = store.new_schedule(9)
+    existing.append(0, 50, title="Second", description="Already here")
+    store.put(existing)
+    store.load(server.GuideSnapshot(path).schedules.values())
+
+    assert rows_of(store.get(5)) == rows_of(schedule)
+    assert rows_of(store.get(9)) == rows_of(existing)
+    assert store.row_count() == 3
@@ -0,0 +1,139 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+import server
+
+ESPN_ID = 6
+DAY = "20250601"  # 2025-06-01T04:00Z to 2025-06-02T04:00Z in the default guide timezone
+
+
+def utc(hour, day=1):
+    return server.calendar.timegm((2025, 6, day, hour, 0, 0, 0, 0, 0))
+
+
+def segment(channel_id, rows):
+    """A source segment from (start, end, fields) tuples"""
+    schedule = server.guide_store.new_schedule(channel_id)
+    for start, end, fields in rows:
+        schedule.append(start, end, **fields)
+    return schedule
+
+
+def fields_of(schedule, *names):
+    return [tuple(row.text(name) for name in names) for row in schedule]
+
+
+def feed(programmes):
+    """An XMLTV feed from (channel, start, end, title, description) tuples"""
+    def stamp(ts):
+        return server.time.strftime("%Y%m%d%H%M%S +0000", server.time.gmtime(ts))
+    rows = "".join(
+        f'<programme start="{stamp(start)}" stop="{stamp(end)}" channel="{channel}">'
+        f'<title>{title}</title><desc>{description}</desc><category>Sports</category></programme>'
+        for channel, start, end, title, description in programmes
+    )
+    return f'<?xml version="1.0"?><tv><channel id="ESPN.us"/>{rows}</tv>'.encode()
+
+
+def espn():
+    return next(channel for channel in server.generate_channels_data() if channel.id == ESPN_ID)
+
+
+def test_merge_fills_missing_and_placeholder_fields_from_lower_priority(store):
+    high = segment(ESPN_ID, [(0, 3600, {"title": "SportsCenter", "episode": "E1", "genre": "General"})])
+    low = segment(ESPN_ID, [(0, 3600, {
+        "title": "sportscenter", "episode": "E2", "description": "Highlights", "genre": "Sports",
+        "rating": "General",
+    })])
+
+    merged = server.merge_sources(ESPN_ID, [(10, low), (30, high)])
+
+    assert fields_of(merged, "title", "episode", "description", "genre", "rating") == [
+        ("SportsCenter", "E1", "Highlights", "Sports", None)
+    ]
+
+
+def test_merge_placeholders_never_replace_real_values(store):
+    high = segment(ESPN_ID, [(0, 3600, {"title": "Game", "description": "Live from Boston"})])
+    low = segment(ESPN_ID, [(0, 3600, {"title": "Game", "description": "No description available"})])
+
+    merged = server.merge_sources(ESPN_ID, [(30, high), (10, low)])
+
+    assert fields_of(merged, "description") == [("Live from Boston",)]
+
+
+@pytest.mark.parametrize("priorities, expected", [
+    ((30, 10), [(0, 3600, "Primary"), (3600, 5400, "Secondary")]),
+    ((10, 30), [(0, 1800, "Primary"), (1800, 5400, "Secondary")]),
+])
+def test_merge_resolves_conflicts_by_priority(store, priorities, expected):
+    primary = segment(ESPN_ID, [(0, 3600, {"title": "Primary"})])
+    secondary = segment(ESPN_ID, [(1800, 5400, {"title": "Secondary"})])
+
+    merged = server.merge_sources(ESPN_ID, [(priorities[0], primary), (priorities[1], secondary)])
+
+    assert [(row.start, row.end, row.text("title")) for row in merged] == expected
+
+
+def test_channel_priority_overrides(monkeypatch):
+    epg_pw = server.EPGPWSource("epg.pw", 30)
+    xmltv = server.XMLTVFeedSource("xmltv.org", "https://example.com/{date}.xml", 20)
+    monkeypatch.setattr(server, "epg_sources", [epg_pw, xmltv])
+    monkeypatch.setattr(server, "CHANNEL_SOURCE_PRIORITIES", {ESPN_ID: {"epg.pw": 5}})
+
+    assert server.channel_sources(espn()) == [(epg_pw, "403793", 5), (xmltv, "ESPN.us", 20)]
+    fox = next(channel for channel in server.generate_channels_data() if channel.id == 1)
+    assert server.channel_sources(fox) == [(epg_pw, "403858", 30)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_parse_xmltv_feed_keeps_wanted_channels_sorted(tmp_path, compress):
+    data = feed([
+        ("ESPN.us", utc(12), utc(13), "Late", "b"),
+        ("Other.us", utc(9), utc(10), "Elsewhere", "c"),
+        ("ESPN.us", utc(9), utc(10), "Early", "a"),
+    ])
+    path = tmp_path / "feed.xml"
+    path.write_bytes(gzip.compress(data) if compress else data)
+
+    with open(path, "rb") as source:
+        index = server.parse_xmltv_feed(source, {"ESPN.us"})
+
+    assert list(index) == ["ESPN.us"]
+    assert [(start, title, description, genre) for start, _, title, _, description, _, _, genre in index["ESPN.us"]] == [
+        (utc(9), "Early", "a", "Sports"),
+        (utc(12), "Late", "b", "Sports"),
+    ]
+
+
+def test_feed_source_slices_guide_days(store):
+    data = gzip.compress(feed([
+        ("ESPN.us", utc(2), utc(4), "Previous day", ""),
+        ("ESPN.us", utc(4), utc(12), "First", ""),
+        ("ESPN.us", utc(12), utc(3, day=2), "Second", ""),
+        ("ESPN.us", utc(3, day=2), utc(4, day=2), "Last", ""),
+        ("ESPN.us", utc(4, day=2), utc(6, day=2), "Next day", ""),
+    ]))
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, content=data)
+
+    source = server.XMLTVFeedSource("xmltv.org", "https://example.com/{date}.xml.gz", 20)
+    source.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def fetch_twice():
+        try:
+            return [await source.fetch(espn(), "ESPN.us", DAY) for _ in range(2)]
+        finally:
+            await source.close_session()
+    first, second = asyncio.run(fetch_twice())
+
+    assert [row.text("title") for row in first] == ["First", "Second", "Last"]
+    assert list(first)[0].text("id") == f"xmltvorg_{ESPN_ID}_{utc(4)}"
+    assert fields_of(second, "title") == fields_of(first, "title")
+    assert requests == [f"https://example.com/{DAY}.xml.gz"]